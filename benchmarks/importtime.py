@@ -0,0 +1,89 @@
+"""
+Startup time of the packages and the biora CLI, one fresh interpreter per run.
+
+    python -m benchmarks.importtime [--runs 20] [--json out.json]
+
+Reports the median and p90 wall time of each command and whether it
+imported requests. The cache-hit command answers a lookup from a warm
+SQLiteCache filled from the local mock server.
+"""
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .mockserver import MockGwasServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = ("biora", "gwascat", "expatlas", "pmcapi")
+
+
+def commands(base_url, cache_path):
+    cli = [sys.executable, "-m", "biora"]
+    return {
+        "python": [sys.executable, "-c", "pass"],
+        "import gwascat": [sys.executable, "-c", "import gwascat"],
+        "import Gwasapi": [sys.executable, "-c", "from gwascat import Gwasapi"],
+        "biora --help": cli + ["--help"],
+        "biora gwas --help": cli + ["gwas", "--help"],
+        "cache hit": cli + ["gwas", "--base-url", base_url, "get", "get_snp", "rs1", "--cache", cache_path],
+    }
+
+
+def run(command):
+    started = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def imports_requests(command):
+    result = subprocess.run(
+        [command[0], "-X", "importtime"] + command[1:],
+        cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return any(line.rsplit("|", 1)[-1].strip() == "requests" for line in result.stderr.splitlines())
+
+
+def measure(runs):
+    # an installed package ships .pyc files; without them (e.g. under
+    # PYTHONDONTWRITEBYTECODE) every run would include recompiling the sources
+    for package in PACKAGES:
+        compileall.compile_dir(os.path.join(ROOT, package), quiet=1)
+    results = []
+    with MockGwasServer() as server, tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "cache.db")
+        for name, command in commands(server.base_url, cache_path).items():
+            run(command)  # warm the OS page cache, .pyc files and the response cache
+            times = sorted(run(command) for _ in range(runs))
+            results.append({
+                "command": name,
+                "median_ms": times[len(times) // 2] * 1000,
+                "p90_ms": times[min(len(times) - 1, int(0.9 * len(times)))] * 1000,
+                "requests": imports_requests(command),
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="interpreter starts per command")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    header = f"{'command':<20}{'median ms':>11}{'p90 ms':>9}{'requests':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['command']:<20}{r['median_ms']:>11.1f}{r['p90_ms']:>9.1f}{'yes' if r['requests'] else 'no':>10}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
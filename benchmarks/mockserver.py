@@ -0,0 +1,169 @@
+"""
+Local stand-in for the GWAS Catalog REST API v2 used by the benchmarks.
+
+Responses are replayed from the recorded records in benchmarks/fixtures
+(one JSON list per collection, refreshed with benchmarks/record.py). List
+endpoints serve `pages` pages of `size` records cycled from the fixtures
+with unique IDs; single-entity endpoints return a fixture record with the
+requested ID. Latency, jitter and the rate of 503 responses are
+configurable, and ETag/If-None-Match revalidation is supported.
+"""
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PREFIX = "/gwas/rest/api/v2"
+
+# collection -> (ID field, ID format for generated records)
+COLLECTIONS = {
+    "studies": ("accession_id", "GCST{:06d}"),
+    "associations": ("association_id", None),
+    "single-nucleotide-polymorphisms": ("rs_id", "rs{}"),
+    "efo-traits": ("efo_id", "EFO_{:07d}"),
+    "publications": ("pubmed_id", "{}"),
+    "genes": ("gene_name", "GENE{}"),
+    "body-of-works": ("bow_id", None),
+    "unpublished-studies": ("accession_id", "GCST{:06d}"),
+}
+SUBCOLLECTIONS = {"loci", "genomic-contexts", "unpublished-ancestries"}
+
+
+def load_fixtures(directory=FIXTURES):
+    fixtures = {}
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                fixtures[name[:-5]] = json.load(f)
+    return fixtures
+
+
+class _Server(ThreadingHTTPServer):
+    # the default listen backlog of 5 drops SYNs under concurrent connects
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class MockGwasServer:
+    def __init__(self, pages=10, size=20, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, fixtures=None):
+        self.pages = pages
+        self.size = size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fixtures = fixtures or load_fixtures()
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _record(self, collection, index):
+        templates = self.fixtures[collection]
+        record = copy.deepcopy(templates[index % len(templates)])
+        id_field, id_format = COLLECTIONS.get(collection, (None, None))
+        if id_field is not None:
+            record[id_field] = index if id_format is None else id_format.format(index)
+        return record
+
+    def _page(self, collection, query):
+        number = int(query.get("page", 0))
+        size = int(query.get("size", self.size))
+        total = self.pages * size
+        start = number * size
+        records = [self._record(collection, index) for index in range(start, min(total, start + size))]
+        return {
+            "_embedded": {collection.replace("-", "_"): records},
+            "_links": {},
+            "page": {"size": size, "totalElements": total, "totalPages": self.pages, "number": number},
+        }
+
+    def respond(self, path, query):
+        """
+        Return (status, body) for a request path below the API prefix.
+        """
+        segments = [segment for segment in path[len(PREFIX):].split("/") if segment]
+        if segments == ["metadata"]:
+            return 200, self.fixtures["metadata"]
+        if len(segments) == 1 and segments[0] in self.fixtures:
+            return 200, self._page(segments[0], query)
+        if len(segments) == 2 and segments[0] in self.fixtures:
+            record = self._record(segments[0], 0)
+            id_field = COLLECTIONS.get(segments[0], (None, None))[0]
+            if id_field is not None:
+                record[id_field] = segments[1]
+            return 200, record
+        if len(segments) >= 3 and segments[2] in SUBCOLLECTIONS and segments[2] in self.fixtures:
+            records = copy.deepcopy(self.fixtures[segments[2]])
+            if len(segments) == 4:
+                return 200, records[0]
+            return 200, {"_embedded": {segments[2].replace("-", "_"): records}, "_links": {}}
+        return 404, {"error": "Not Found", "path": path}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately; without this, Nagle's
+            # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    delay = server.latency + server._random.uniform(0, server.jitter)
+                    fail = server._random.random() < server.error_rate
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self._send(503, b"", {"Retry-After": "0"})
+                    return
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                status, body = server.respond(url.path, query)
+                data = json.dumps(body).encode("utf-8")
+                etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                self._send(status, data, {"Content-Type": "application/json", "ETag": etag})
+
+            def _send(self, status, data, headers):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
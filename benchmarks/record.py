@@ -0,0 +1,53 @@
+"""
+Record fresh fixtures for the mock server from the live GWAS Catalog API.
+
+    python -m benchmarks.record [--size 5]
+
+Writes the first records of every list endpoint, plus metadata, loci and
+genomic contexts of the first association and SNP, to benchmarks/fixtures.
+"""
+import argparse
+import json
+import os
+
+from gwascat import Gwasapi
+from gwascat.gwasapi import page_records
+
+from .mockserver import FIXTURES
+
+LISTS = {
+    "studies": "get_studies",
+    "associations": "get_associations",
+    "single-nucleotide-polymorphisms": "get_snps",
+    "efo-traits": "get_efo_traits",
+    "publications": "get_publications",
+    "genes": "get_genes",
+}
+
+
+def write(name, data):
+    with open(os.path.join(FIXTURES, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=5, help="records to record per endpoint")
+    args = parser.parse_args(argv)
+
+    with Gwasapi() as api:
+        write("metadata", api.get_metadata())
+        records = {}
+        for name, method in LISTS.items():
+            records[name] = page_records(getattr(api, method)(size=args.size))
+            write(name, records[name])
+        association = records["associations"][0]
+        association_id = association.get("association_id", association.get("associationId"))
+        write("loci", page_records(api.get_loci(association_id)))
+        snp = records["single-nucleotide-polymorphisms"][0]
+        write("genomic-contexts", page_records(api.get_genomic_contexts(snp.get("rs_id", snp.get("rsId")))))
+
+
+if __name__ == "__main__":
+    main()
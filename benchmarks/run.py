@@ -0,0 +1,232 @@
+"""
+Offline throughput benchmarks for Gwasapi against the local mock server.
+
+    python -m benchmarks.run [--latency 0.02] [--pages 20] [--lookups 200] [--json out.json]
+
+Each scenario reports logical operations (one lookup or one page) per
+second, HTTP requests per second as seen by the server, and p50/p99
+latency per operation.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from gwascat import AsyncGwasapi, Gwasapi
+from gwascat.cache import SQLiteCache
+
+from .mockserver import MockGwasServer
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def timed(self, function):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.latencies.append(elapsed)
+        wrapper.__name__ = function.__name__
+        return wrapper
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def lookups(api, recorder, ids):
+    get_snp = recorder.timed(api.get_snp)
+    for rs_id in ids:
+        get_snp(rs_id)
+
+
+def scenario_serial(server, args, recorder):
+    # a fresh connection per request, as with the module-level requests.get
+    with Gwasapi(base_url=server.base_url) as api:
+        api.session.headers["connection"] = "close"
+        lookups(api, recorder, args.ids)
+
+
+def scenario_pooled(server, args, recorder):
+    with Gwasapi(base_url=server.base_url) as api:
+        lookups(api, recorder, args.ids)
+
+
+def scenario_concurrent(server, args, recorder):
+    with Gwasapi(base_url=server.base_url, pool_size=args.workers) as api:
+        api.get_snp = recorder.timed(api.get_snp)
+        for result in api.get_snps_bulk(args.ids):
+            if result.error is not None:
+                raise result.error
+
+
+def scenario_async(server, args, recorder):
+    async def lookup(api, rs_id):
+        started = time.perf_counter()
+        await api.get_snp(rs_id)
+        recorder.latencies.append(time.perf_counter() - started)
+
+    async def main():
+        async with AsyncGwasapi(base_url=server.base_url, max_concurrency=args.workers) as api:
+            await asyncio.gather(*(lookup(api, rs_id) for rs_id in args.ids))
+
+    asyncio.run(main())
+
+
+def setup_cache_cold(server, args):
+    cache = SQLiteCache(args.cache_path)
+    cache.clear()
+    cache.close()
+
+
+def setup_cache_warm(server, args):
+    # filled here, untimed, so cache_warm does not depend on cache_cold having run before it
+    with Gwasapi(base_url=server.base_url, cache=SQLiteCache(args.cache_path)) as api:
+        for rs_id in args.ids:
+            api.get_snp(rs_id)
+
+
+def scenario_cache_cold(server, args, recorder):
+    with Gwasapi(base_url=server.base_url, cache=SQLiteCache(args.cache_path)) as api:
+        lookups(api, recorder, args.ids)
+
+
+def scenario_cache_warm(server, args, recorder):
+    with Gwasapi(base_url=server.base_url, cache=SQLiteCache(args.cache_path)) as api:
+        lookups(api, recorder, args.ids)
+
+
+def paginate(server, recorder, **options):
+    with Gwasapi(base_url=server.base_url) as api:
+        api.get_associations = recorder.timed(api.get_associations)
+        for _ in api.iter_associations(**options):
+            pass
+
+
+def scenario_pages_serial(server, args, recorder):
+    paginate(server, recorder, prefetch=False)
+
+
+def scenario_pages_prefetch(server, args, recorder):
+    paginate(server, recorder)
+
+
+def scenario_pages_stream(server, args, recorder):
+    paginate(server, recorder, stream=True)
+
+
+def scenario_pages_fanout(server, args, recorder):
+    with Gwasapi(base_url=server.base_url, pool_size=args.workers) as api:
+        api.get_associations = recorder.timed(api.get_associations)
+        api.get_all_associations()
+
+
+SCENARIOS = {
+    "serial": scenario_serial,
+    "pooled": scenario_pooled,
+    "concurrent": scenario_concurrent,
+    "async": scenario_async,
+    "cache_cold": scenario_cache_cold,
+    "cache_warm": scenario_cache_warm,
+    "pages_serial": scenario_pages_serial,
+    "pages_prefetch": scenario_pages_prefetch,
+    "pages_stream": scenario_pages_stream,
+    "pages_fanout": scenario_pages_fanout,
+}
+
+# scenario -> untimed preparation run before it
+SETUP = {
+    "cache_cold": setup_cache_cold,
+    "cache_warm": setup_cache_warm,
+}
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+def run(args):
+    results = []
+    server = MockGwasServer(
+        pages=args.pages, size=args.size, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate,
+    )
+    with server, tempfile.TemporaryDirectory() as directory:
+        args.cache_path = os.path.join(directory, "cache.db")
+        for name in args.scenarios:
+            recorder = Recorder()
+            setup = SETUP.get(name)
+            if setup is not None:
+                setup(server, args)
+            requests_before = server.requests
+            started = time.perf_counter()
+            try:
+                SCENARIOS[name](server, args, recorder)
+            except ImportError as exc:
+                print(f"skipping {name}: {exc}", file=sys.stderr)
+                continue
+            elapsed = time.perf_counter() - started
+            operations = len(recorder.latencies)
+            requests = server.requests - requests_before
+            results.append({
+                "scenario": name,
+                "operations": operations,
+                "requests": requests,
+                "seconds": elapsed,
+                "ops_per_second": operations / elapsed,
+                "requests_per_second": requests / elapsed,
+                # None when the scenario recorded no operations (e.g. --lookups 0)
+                "p50_ms": _ms(percentile(recorder.latencies, 0.5)),
+                "p99_ms": _ms(percentile(recorder.latencies, 0.99)),
+            })
+    return results
+
+
+def print_table(results):
+    header = f"{'scenario':<16}{'ops':>7}{'reqs':>7}{'seconds':>9}{'ops/s':>10}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        p50, p99 = (f"{value:.2f}" if value is not None else "-" for value in (r["p50_ms"], r["p99_ms"]))
+        print(
+            f"{r['scenario']:<16}{r['operations']:>7}{r['requests']:>7}{r['seconds']:>9.2f}"
+            f"{r['ops_per_second']:>10.1f}{r['requests_per_second']:>10.1f}{p50:>9}{p99:>9}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.01, help="server latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--pages", type=int, default=20, help="pages served by list endpoints")
+    parser.add_argument("--size", type=int, default=100, help="records per page")
+    parser.add_argument("--lookups", type=int, default=200, help="single-entity lookups per scenario")
+    parser.add_argument("--workers", type=int, default=16, help="concurrency of concurrent, async and fan-out scenarios")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    args.ids = [f"rs{index}" for index in range(args.lookups)]
+
+    results = run(args)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+biora: command line entry point for the bioresearch data tools.
+
+    biora gwas get get_study GCST000854
+    biora gwas export associations out.ndjson.gz --param efo_id=EFO_0000270
+    biora join joined.ndjson --param efo_id=EFO_0000270 --experiment E-MTAB-513
+
+Only argparse is imported up front; a tool's module, and with it the
+HTTP and JSON backends, is imported once its subcommand is chosen, so
+"biora --help" starts without loading any client.
+"""
+import argparse
+import importlib
+import sys
+
+# tool name -> (module with main(argv, prog), help)
+TOOLS = {
+    "gwas": ("gwascat.__main__", "GWAS Catalog: query endpoints, mirror, export and watch"),
+    "join": ("biora.pipeline", "join GWAS associations with gene expression and PMC literature"),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in TOOLS:
+        module = importlib.import_module(TOOLS[argv[0]][0])
+        return module.main(argv[1:], prog=f"biora {argv[0]}")
+
+    parser = argparse.ArgumentParser(prog="biora", description="Bioresearch data tools")
+    tools = parser.add_subparsers(dest="tool", required=True, metavar="TOOL")
+    for name, (_, help) in TOOLS.items():
+        tools.add_parser(name, help=help, add_help=False)
+    parser.parse_args(argv)
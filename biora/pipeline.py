@@ -0,0 +1,326 @@
+"""
+Streaming join of GWAS associations with expression data and literature.
+
+    biora join joined.ndjson --param efo_id=EFO_0000270 \\
+        --experiment E-MTAB-513 --cache-dir ~/.cache/biora
+
+Every association's mapped genes are looked up in Expression Atlas
+experiment matrices and its study PubMed ID is resolved to PMC full text.
+Each gene and PMID is fetched once, however many associations share it.
+"""
+import argparse
+import json
+import math
+import os
+import queue
+import sys
+import threading
+from collections import namedtuple
+
+from gwascat.columnar import field_value
+
+Joined = namedtuple("Joined", ["association", "expression", "literature", "errors"])
+
+
+def mapped_genes(association):
+    return [str(gene) for gene in field_value(association, "mapped_genes", "mappedGenes") or [] if gene]
+
+
+def pubmed_id(association):
+    value = field_value(association, "pubmed_id", "pubmedId")
+    return str(value) if value else None
+
+
+class _Pending:
+    __slots__ = ("association", "genes", "pmid", "missing")
+
+    def __init__(self, association, genes, pmid, missing):
+        self.association = association
+        self.genes = genes
+        self.pmid = pmid
+        self.missing = missing
+
+
+class JoinPipeline:
+    def __init__(self, gwas, expression=None, literature=None, experiments=(), kind="tpms",
+                 expression_workers=4, literature_workers=None, queue_size=1000):
+        """
+        Join gwascat.Gwasapi associations with expatlas.Expatlasapi expression
+        values of their mapped genes and pmcapi.Pmcapi full text of their
+        study publications.
+
+        The three sources run concurrently: associations are paged in a
+        background thread, gene expression is sliced on a pool of
+        expression_workers threads once the matrices of experiments (of the
+        given kind) are cached, and PMIDs are resolved and fetched on a pool
+        of literature_workers threads (default: literature.max_workers).
+        New PMIDs are sent to the ID converter in one batch whenever the
+        previous batch has returned, so batches grow with the backlog
+        instead of waiting to fill up.
+
+        Either expression or literature may be None to skip that source.
+        queue_size bounds the associations read but not yet emitted, whether
+        queued or waiting for lookups, so the reader pauses when lookups or
+        the consumer fall behind.
+        """
+        self.gwas = gwas
+        self.expression = expression
+        self.literature = literature
+        self.experiments = list(experiments) if expression is not None else []
+        self.kind = kind
+        self.expression_workers = expression_workers
+        self.literature_workers = literature_workers or (literature.max_workers if literature is not None else 1)
+        self.queue_size = queue_size
+        self.stats = {}
+
+    def run(self, **params):
+        """
+        Yield a Joined(association, expression, literature, errors) tuple for
+        every association matching the get_associations parameters, as soon
+        as all its parts have arrived (so not in catalog order).
+
+        expression maps each mapped gene to {experiment: {column: value}},
+        leaving out experiments that do not measure the gene (values are
+        floats, None where missing); literature is the parsed article of the
+        study (see pmcapi.parse_article), None without open full text.
+        errors maps "gene:<symbol>" or "pmid:<id>" to the exception of a
+        failed lookup, whose part is then left out or None. A failure to
+        page the associations is raised.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        # results of lookups are never held back (a callback may run on the
+        # consuming thread itself); only the association reader is throttled
+        events = queue.Queue()
+        slots = threading.Semaphore(self.queue_size)
+        stop = threading.Event()
+        stats = self.stats = {"associations": 0, "genes": 0, "pmids": 0, "articles": 0, "emitted": 0}
+
+        def read_associations():
+            try:
+                for association in self.gwas.iter_associations(**params):
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    events.put(("association", association))
+            except Exception as error:
+                events.put(("failed", error))
+            events.put(("read",))
+
+        def completed(kind, key):
+            def callback(future):
+                if future.cancelled():
+                    return
+                error = future.exception()
+                events.put((kind, key, None if error is not None else future.result(), error))
+            return callback
+
+        expression_pool = ThreadPoolExecutor(max_workers=self.expression_workers)
+        literature_pool = ThreadPoolExecutor(max_workers=self.literature_workers)
+        matrices = {
+            accession: expression_pool.submit(self.expression.get_matrix, accession, self.kind)
+            for accession in self.experiments
+        }
+        reader = threading.Thread(target=read_associations, name="biora-associations", daemon=True)
+        reader.start()
+
+        genes = {}        # gene -> expression, once fetched
+        articles = {}     # pmid -> (article, error), once fetched
+        gene_errors = {}
+        waiting = {}      # "gene:<symbol>" / "pmid:<id>" -> [_Pending]
+        unconverted = []  # PMIDs waiting for the next ID conversion batch
+        converting = False
+        in_flight = 0     # submitted lookups and batches whose result has not been handled
+        reading = True
+
+        def joined(pending):
+            expression = {gene: genes[gene] for gene in pending.genes if genes.get(gene) is not None}
+            errors = {f"gene:{gene}": gene_errors[gene] for gene in pending.genes if gene in gene_errors}
+            article = None
+            if pending.pmid is not None:
+                article, error = articles[pending.pmid]
+                if error is not None:
+                    errors[f"pmid:{pending.pmid}"] = error
+            stats["emitted"] += 1
+            # the association no longer counts against queue_size once its record is handed out
+            slots.release()
+            return Joined(pending.association, expression, article, errors)
+
+        def resolve(key):
+            for pending in waiting.pop(key, ()):
+                pending.missing -= 1
+                if pending.missing == 0:
+                    yield joined(pending)
+
+        def convert_next():
+            nonlocal converting, in_flight
+            if converting or not unconverted:
+                return
+            batch = unconverted[:]
+            unconverted.clear()
+            converting = True
+            in_flight += 1
+            literature_pool.submit(self.literature.convert_ids, batch).add_done_callback(
+                completed("pmcids", batch)
+            )
+
+        try:
+            while reading or in_flight:
+                event = events.get()
+                kind = event[0]
+                if kind == "failed":
+                    raise event[1]
+                if kind == "read":
+                    reading = False
+                    continue
+
+                if kind == "association":
+                    association = event[1]
+                    stats["associations"] += 1
+                    pending = _Pending(association, [], None, 0)
+                    if self.expression is not None:
+                        pending.genes = list(dict.fromkeys(mapped_genes(association)))
+                    for gene in pending.genes:
+                        if gene in genes:
+                            continue
+                        pending.missing += 1
+                        key = f"gene:{gene}"
+                        if key not in waiting:
+                            waiting[key] = []
+                            stats["genes"] += 1
+                            in_flight += 1
+                            expression_pool.submit(self._gene_expression, matrices, gene).add_done_callback(
+                                completed("gene", gene)
+                            )
+                        waiting[key].append(pending)
+                    if self.literature is not None:
+                        pending.pmid = pubmed_id(association)
+                    if pending.pmid is not None and pending.pmid not in articles:
+                        pending.missing += 1
+                        key = f"pmid:{pending.pmid}"
+                        if key not in waiting:
+                            waiting[key] = []
+                            stats["pmids"] += 1
+                            unconverted.append(pending.pmid)
+                            convert_next()
+                        waiting[key].append(pending)
+                    if pending.missing == 0:
+                        yield joined(pending)
+                    continue
+
+                _, key, value, error = event
+                in_flight -= 1
+                if kind == "gene":
+                    genes[key] = value
+                    if error is not None:
+                        gene_errors[key] = error
+                    yield from resolve(f"gene:{key}")
+                elif kind == "pmcids":
+                    converting = False
+                    for pmid in key:
+                        pmcid = value.get(pmid) if error is None else None
+                        if pmcid is None:
+                            articles[pmid] = (None, error)
+                            yield from resolve(f"pmid:{pmid}")
+                        else:
+                            stats["articles"] += 1
+                            in_flight += 1
+                            literature_pool.submit(self.literature.get_article, pmcid).add_done_callback(
+                                completed("article", pmid)
+                            )
+                    convert_next()
+                elif kind == "article":
+                    articles[key] = (value, error)
+                    yield from resolve(f"pmid:{key}")
+        finally:
+            stop.set()
+            expression_pool.shutdown(wait=False, cancel_futures=True)
+            literature_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _gene_expression(self, matrices, gene):
+        expression = {}
+        for accession, matrix in matrices.items():
+            ids, columns, values = matrix.result().slice([gene])
+            if ids:
+                expression[accession] = {
+                    column: None if math.isnan(value) else value
+                    for column, value in zip(columns, values[0].tolist())
+                }
+        return expression
+
+
+def join(gwas, expression=None, literature=None, experiments=(), kind="tpms", **params):
+    """
+    Stream Joined records for the associations matching params; see JoinPipeline.run.
+    """
+    return JoinPipeline(gwas, expression, literature, experiments, kind).run(**params)
+
+
+def _summary(article):
+    if article is None:
+        return None
+    return {
+        "pmcid": article["pmcid"],
+        "title": article["title"],
+        "sections": [section["title"] for section in article["sections"]],
+    }
+
+
+def main(argv=None, prog="biora join"):
+    from gwascat.__main__ import parse_param
+    from gwascat.gwasapi import BASE_URL
+
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="NDJSON output file, - for stdout")
+    parser.add_argument(
+        "--param", dest="params", type=parse_param, action="append", default=[], metavar="NAME=VALUE",
+        help="get_associations parameter, e.g. efo_id=EFO_0000270 (repeatable)",
+    )
+    parser.add_argument(
+        "--experiment", dest="experiments", action="append", default=[], metavar="ACCESSION",
+        help="Expression Atlas experiment to take expression from (repeatable)",
+    )
+    parser.add_argument("--kind", default="tpms", help="experiment matrix, e.g. tpms or analytics")
+    parser.add_argument("--no-literature", action="store_true", help="do not fetch PMC full text")
+    parser.add_argument("--cache-dir", default="biora-cache", help="matrix and article cache directory")
+    parser.add_argument("--base-url", default=BASE_URL, help="GWAS Catalog REST API v2 root")
+    parser.add_argument("--email", help="contact address sent to the NCBI ID converter")
+    args = parser.parse_args(argv)
+
+    from gwascat import Gwasapi
+
+    expression = literature = None
+    if args.experiments:
+        from expatlas import Expatlasapi
+        expression = Expatlasapi(os.path.join(args.cache_dir, "expatlas"))
+    if not args.no_literature:
+        from pmcapi import Pmcapi
+        literature = Pmcapi(os.path.join(args.cache_dir, "pmc"), email=args.email)
+
+    out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8")
+    pipeline = JoinPipeline(Gwasapi(base_url=args.base_url), expression, literature, args.experiments, args.kind)
+    try:
+        for record in pipeline.run(**dict(args.params)):
+            out.write(json.dumps({
+                "association": record.association,
+                "expression": record.expression,
+                "literature": _summary(record.literature),
+                "errors": {key: repr(error) for key, error in record.errors.items()},
+            }) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        pipeline.gwas.close()
+        for client in (expression, literature):
+            if client is not None:
+                client.close()
+    stats = pipeline.stats
+    print(
+        f"{stats['emitted']} associations joined: {stats['genes']} distinct genes, "
+        f"{stats['pmids']} distinct PMIDs, {stats['articles']} articles",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+from gwascat.http import HTTPClient
+from gwascat.resilience import RetryPolicy
+
+BASE_URL = "https://www.ebi.ac.uk/gxa"
+FILES_URL = "https://ftp.ebi.ac.uk/pub/databases/microarray/data/atlas/experiments"
+
+DTYPE = "float32"
+MISSING = {"", "NA", "NaN", "nan", "null"}
+
+
+def _to_float(field):
+    """
+    Parse one matrix cell. Baseline matrices may hold quartiles as
+    "min,q1,median,q3,max", in which case the median is used.
+    """
+    if field in MISSING:
+        return float("nan")
+    if "," in field:
+        values = field.split(",")
+        return _to_float(values[len(values) // 2])
+    try:
+        return float(field)
+    except ValueError:
+        return float("nan")
+
+
+def parse_chunk(lines, width):
+    """
+    Parse TSV data lines of an expression matrix into (gene IDs, gene names,
+    float32 array of shape (len(lines), width)). The first two fields of a
+    line are the gene ID and name, the remaining ones the values.
+    """
+    import numpy as np
+
+    ids, names, values = [], [], []
+    for line in lines:
+        fields = line.rstrip("\r\n").split("\t")
+        ids.append(fields[0])
+        names.append(fields[1] if len(fields) > 1 else "")
+        row = fields[2:2 + width]
+        row.extend([""] * (width - len(row)))
+        values.append(row)
+    try:
+        array = np.array(values, dtype=DTYPE)
+    except ValueError:
+        array = np.array([[_to_float(field) for field in row] for row in values], dtype=DTYPE)
+    return ids, names, array.reshape(len(values), width)
+
+
+class ExpressionMatrix:
+    def __init__(self, directory, kind):
+        """
+        Expression matrix of one experiment stored as a raw float32 file that
+        is memory-mapped on open, so slicing a few genes out of a matrix of
+        several GB only reads the pages holding their rows.
+
+        genes and gene_names list the row labels, columns the column
+        labels (assay groups or contrasts); index maps gene IDs and names
+        to row numbers.
+        """
+        import numpy as np
+
+        with open(os.path.join(directory, f"{kind}.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.kind = kind
+        self.accession = meta["accession"]
+        self.columns = meta["columns"]
+        self.genes = meta["genes"]
+        self.gene_names = meta["gene_names"]
+        self.meta = meta
+        shape = (len(self.genes), len(self.columns))
+        path = os.path.join(directory, f"{kind}.f32")
+        if shape[0] and shape[1]:
+            self.values = np.memmap(path, dtype=DTYPE, mode="r", shape=shape)
+        else:
+            self.values = np.empty(shape, dtype=DTYPE)
+        self.index = {}
+        for row, name in enumerate(self.gene_names):
+            if name:
+                self.index.setdefault(name, row)
+        for row, gene in enumerate(self.genes):
+            self.index[gene] = row
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return len(self.genes)
+
+    def rows(self, genes):
+        """
+        Return the sorted row numbers of the given gene IDs or names; unknown genes are skipped.
+        """
+        return sorted({self.index[gene] for gene in genes if gene in self.index})
+
+    def column_indexes(self, columns):
+        positions = {column: index for index, column in enumerate(self.columns)}
+        return [positions[column] for column in columns]
+
+    def slice(self, genes=None, columns=None):
+        """
+        Return (gene IDs, column labels, values) for a subset of genes
+        (IDs or names) and columns; None selects all. values is an
+        in-memory float32 array with NaN for missing values.
+        """
+        import numpy as np
+
+        rows = range(len(self.genes)) if genes is None else self.rows(genes)
+        cols = range(len(self.columns)) if columns is None else self.column_indexes(columns)
+        if genes is None and columns is None:
+            values = np.array(self.values)
+        else:
+            values = self.values[np.asarray(rows, dtype=np.intp)][:, np.asarray(cols, dtype=np.intp)]
+        return [self.genes[row] for row in rows], [self.columns[col] for col in cols], values
+
+    def to_pandas(self, genes=None, columns=None):
+        """
+        Return a subset as a pandas.DataFrame indexed by gene ID.
+        """
+        import pandas as pd
+
+        index, labels, values = self.slice(genes, columns)
+        return pd.DataFrame(values, index=pd.Index(index, name="gene_id"), columns=labels)
+
+    def iter_genes(self, chunk_rows=10000):
+        """
+        Yield (gene IDs, values) blocks of at most chunk_rows rows, for scans
+        over the whole matrix in bounded memory.
+        """
+        import numpy as np
+
+        for start in range(0, len(self.genes), chunk_rows):
+            stop = min(len(self.genes), start + chunk_rows)
+            yield self.genes[start:stop], np.array(self.values[start:stop])
+
+
+class Expatlasapi:
+    def __init__(
+        self,
+        cache_dir,
+        base_url=BASE_URL,
+        files_url=FILES_URL,
+        timeout=(5, 60),
+        chunk_rows=10000,
+        rate_limiter=None,
+        retry=RetryPolicy(),
+        session=None,
+        transport=None
+    ):
+        """
+        Client for the Expression Atlas experiment API and matrix downloads.
+
+        Experiment expression matrices (baseline "tpms"/"fpkms" or
+        differential "analytics" TSV files) are streamed into cache_dir:
+        chunk_rows lines at a time are parsed into a float32 block and
+        appended to a raw file, so memory does not grow with the matrix.
+        Each experiment is downloaded once; get_matrix then opens the
+        cached copy as a memory-mapped ExpressionMatrix. Downloads are
+        written to temporary files and only replace the cached copy once
+        complete.
+
+        Requests go through a gwascat.http.HTTPClient, whose session is
+        created on first network use; rate_limiter (a
+        gwascat.resilience.TokenBucket) and retry apply to every request.
+        Requires numpy.
+        """
+        self.cache_dir = cache_dir
+        self.base_url = base_url.rstrip("/")
+        self.files_url = files_url.rstrip("/")
+        self.chunk_rows = chunk_rows
+        self.http = HTTPClient(timeout, rate_limiter, retry, session, transport)
+        self._lock = threading.Lock()
+        self._locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def close(self):
+        """
+        Close the pooled session and release its connections.
+        """
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_experiments(self):
+        """
+        Fetch the list of all Expression Atlas experiments.
+        Returns the JSON response as a Python dict.
+        """
+        url = f"{self.base_url}/json/experiments"
+        return self.http.get(url).json()
+
+    def get_experiment(self, accession):
+        """
+        Fetch the metadata of one experiment by accession (e.g. E-MTAB-513).
+        Returns the JSON response as a Python dict.
+        """
+        url = f"{self.base_url}/json/experiments/{accession}"
+        return self.http.get(url).json()
+
+    def matrix_url(self, accession, kind="tpms"):
+        return f"{self.files_url}/{accession}/{accession}-{kind}.tsv"
+
+    def _directory(self, accession):
+        return os.path.join(self.cache_dir, accession)
+
+    def _experiment_lock(self, accession, kind):
+        with self._lock:
+            return self._locks.setdefault((accession, kind), threading.Lock())
+
+    def is_cached(self, accession, kind="tpms"):
+        return os.path.exists(os.path.join(self._directory(accession), f"{kind}.json"))
+
+    def get_matrix(self, accession, kind="tpms", refresh=False):
+        """
+        Return the ExpressionMatrix of an experiment, downloading it first if
+        it is not cached. kind names the matrix file: "tpms" or "fpkms" for
+        baseline and "analytics" for differential experiments (for microarray
+        designs e.g. "A-AFFY-44-analytics"). With refresh, a cached matrix is
+        revalidated with the server and downloaded again only if it changed.
+        """
+        with self._experiment_lock(accession, kind):
+            if not self.is_cached(accession, kind):
+                self.download_matrix(accession, kind)
+            elif refresh:
+                self.download_matrix(accession, kind, revalidate=True)
+        return ExpressionMatrix(self._directory(accession), kind)
+
+    def get_expression(self, accession, genes, kind="tpms", columns=None):
+        """
+        Return (gene IDs, column labels, values) for the given genes (IDs or
+        names) of an experiment; see ExpressionMatrix.slice.
+        """
+        return self.get_matrix(accession, kind).slice(genes, columns)
+
+    def download_matrix(self, accession, kind="tpms", revalidate=False):
+        """
+        Stream one experiment matrix into the cache and return its metadata.
+        With revalidate, the cached ETag/Last-Modified are sent and a 304
+        response keeps the cached copy.
+        """
+        import numpy as np
+
+        directory = self._directory(accession)
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, f"{kind}.json")
+        headers = {}
+        if revalidate and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("etag"):
+                headers["if-none-match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["if-modified-since"] = cached["last_modified"]
+        url = self.matrix_url(accession, kind)
+        response = self.http.get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 304:
+                return cached
+            response.encoding = "utf-8"
+            lines = response.iter_lines(chunk_size=1 << 20, decode_unicode=True)
+            columns = None
+            for line in lines:
+                if line and not line.startswith("#"):
+                    columns = line.rstrip("\r\n").split("\t")[2:]
+                    break
+            if columns is None:
+                raise ValueError(f"{url} holds no expression matrix")
+            width = len(columns)
+            values_path = os.path.join(directory, f"{kind}.f32")
+            genes, gene_names = [], []
+            with open(values_path + ".tmp", "wb") as out:
+                chunk = []
+                for line in lines:
+                    if not line or line.startswith("#"):
+                        continue
+                    chunk.append(line)
+                    if len(chunk) >= self.chunk_rows:
+                        self._write_chunk(out, chunk, width, genes, gene_names)
+                        chunk = []
+                if chunk:
+                    self._write_chunk(out, chunk, width, genes, gene_names)
+        finally:
+            response.close()
+
+        meta = {
+            "accession": accession,
+            "kind": kind,
+            "url": url,
+            "columns": columns,
+            "genes": genes,
+            "gene_names": gene_names,
+            "dtype": np.dtype(DTYPE).name,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "downloaded_at": time.time(),
+        }
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        # the metadata is moved into place last, so it only ever describes a complete values file
+        os.replace(values_path + ".tmp", values_path)
+        os.replace(meta_path + ".tmp", meta_path)
+        return meta
+
+    def _write_chunk(self, out, lines, width, genes, gene_names):
+        ids, names, block = parse_chunk(lines, width)
+        out.write(block.tobytes())
+        genes.extend(ids)
+        gene_names.extend(names)
+
+    def remove(self, accession):
+        """
+        Delete all cached matrices of an experiment.
+        """
+        shutil.rmtree(self._directory(accession), ignore_errors=True)
+
+    def cached_experiments(self):
+        """
+        Return the accessions with at least one cached matrix.
+        """
+        names = []
+        for name in os.listdir(self.cache_dir):
+            directory = os.path.join(self.cache_dir, name)
+            if os.path.isdir(directory) and any(entry.endswith(".json") for entry in os.listdir(directory)):
+                names.append(name)
+        return sorted(names)
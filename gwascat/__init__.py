@@ -1 +1,23 @@
-from .gwasapi import Gwasapi
\ No newline at end of file
+import importlib
+
+# public name -> defining submodule; imported on first attribute access (PEP 562)
+# so that "import gwascat" does not load HTTP, JSON or dataframe backends
+_EXPORTS = {
+    "Gwasapi": ".gwasapi",
+    "AsyncGwasapi": ".asyncgwasapi",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,151 @@
+import argparse
+import json
+import sys
+
+from .endpoints import ENDPOINTS
+from .export import COMPRESSIONS, FORMATS
+from .gwasapi import BASE_URL, Gwasapi
+from .mirror import ENTITIES, Mirror
+from .watch import Watch
+
+
+def progress(entity, page, total_pages):
+    print(f"{entity}: page {page + 1}/{total_pages}", file=sys.stderr)
+
+
+def mirror_command(args):
+    with Gwasapi(base_url=args.base_url) as api, Mirror(args.path) as mirror:
+        summary = mirror.sync(api, args.entities, args.page_size, None if args.quiet else progress)
+    for entity, counts in summary.items():
+        print(f"{entity}: {counts['added']} added, {counts['changed']} changed, {counts['removed']} removed")
+
+
+def parse_param(text):
+    name, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    return name, value
+
+
+def get_command(args):
+    cache = None
+    if args.cache:
+        from .cache import SQLiteCache
+        cache = SQLiteCache(args.cache)
+    try:
+        with Gwasapi(base_url=args.base_url, cache=cache) as api:
+            result = getattr(api, args.endpoint)(*args.args, **dict(args.params))
+    finally:
+        if cache is not None:
+            cache.close()
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+def export_command(args):
+    with Gwasapi(base_url=args.base_url) as api:
+        summary = api.export(
+            args.entity, args.path, args.format, args.page_size, args.row_group_size,
+            args.compression, args.workers, None if args.quiet else progress, **dict(args.params)
+        )
+    resumed = f", resumed at page {summary['resumed'] + 1}" if summary["resumed"] else ""
+    print(f"{args.entity}: {summary['rows']} records from {summary['pages']} pages{resumed}")
+
+
+def watch_command(args):
+    with Watch(args.path) as watch:
+        if args.action == "add":
+            watch.add(args.name, args.method, args.page_size, **dict(args.params))
+            return
+        if args.action == "remove":
+            watch.remove(args.name)
+            return
+        if args.action == "list":
+            for name, (method, params) in watch.queries().items():
+                print(f"{name}: {method} {json.dumps(params)}")
+            return
+        with Gwasapi(base_url=args.base_url) as api:
+            for diff in watch.check(api, args.names or None, args.workers, args.force):
+                if diff.skipped:
+                    print(f"{diff.name}: release unchanged")
+                    continue
+                if diff.error is not None:
+                    print(f"{diff.name}: failed: {diff.error}")
+                    continue
+                print(
+                    f"{diff.name}: {len(diff.added)} added, {len(diff.changed)} changed, "
+                    f"{len(diff.removed)} removed ({diff.fetched}/{diff.pages} pages downloaded)"
+                )
+
+
+def main(argv=None, prog="gwascat"):
+    parser = argparse.ArgumentParser(prog=prog, description="GWAS Catalog tools")
+    parser.add_argument("--base-url", default=BASE_URL, help="GWAS Catalog REST API v2 root")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="call one API endpoint and print the JSON response")
+    get.add_argument("endpoint", choices=list(ENDPOINTS), metavar="ENDPOINT", help="method name, e.g. get_study")
+    get.add_argument("args", nargs="*", help="positional arguments, e.g. an accession ID")
+    get.add_argument(
+        "--param", dest="params", type=parse_param, action="append", default=[], metavar="NAME=VALUE",
+        help="keyword argument of the method (repeatable)",
+    )
+    get.add_argument("--cache", help="SQLite response cache; fresh responses are served without a request")
+    get.set_defaults(func=get_command)
+
+    mirror = commands.add_parser("mirror", help="create or update a local catalog mirror")
+    mirror.add_argument("path", help="SQLite file holding the mirror")
+    mirror.add_argument("--entities", nargs="+", choices=list(ENTITIES), help="entities to sync (default: all)")
+    mirror.add_argument("--page-size", type=int, default=200, help="records per request")
+    mirror.add_argument("--quiet", action="store_true", help="do not report progress")
+    mirror.set_defaults(func=mirror_command)
+
+    compressions = sorted({name for _, supported in COMPRESSIONS.values() for name in supported})
+    export = commands.add_parser("export", help="export all results of a query to NDJSON or Parquet")
+    export.add_argument("entity", choices=list(ENTITIES), help="entity to export")
+    export.add_argument("path", help="output file (ndjson) or directory (parquet)")
+    export.add_argument("--format", choices=FORMATS, default="ndjson", help="output format")
+    export.add_argument(
+        "--param", dest="params", type=parse_param, action="append", default=[], metavar="NAME=VALUE",
+        help="query parameter of the list method, e.g. efo_id=EFO_0000270 (repeatable)",
+    )
+    export.add_argument("--page-size", type=int, default=200, help="records per request")
+    export.add_argument("--row-group-size", type=int, default=10000, help="records per written batch")
+    export.add_argument("--compression", choices=compressions, help="default: gzip for ndjson, zstd for parquet")
+    export.add_argument("--workers", type=int, help="concurrent page requests")
+    export.add_argument("--quiet", action="store_true", help="do not report progress")
+    export.set_defaults(func=export_command)
+
+    watch = commands.add_parser("watch", help="save queries and report changes to their results")
+    actions = watch.add_subparsers(dest="action", required=True)
+    add = actions.add_parser("add", help="save a query")
+    add.add_argument("path", help="SQLite file holding the saved queries")
+    add.add_argument("name", help="query name")
+    lists = [endpoint.name for endpoint in ENDPOINTS.values() if endpoint.paginated and not endpoint.args]
+    add.add_argument(
+        "--method", default="get_associations", choices=lists, metavar="METHOD",
+        help="list method, e.g. get_studies (default: get_associations)",
+    )
+    add.add_argument(
+        "--param", dest="params", type=parse_param, action="append", default=[], metavar="NAME=VALUE",
+        help="query parameter of the list method, e.g. efo_id=EFO_0000270 (repeatable)",
+    )
+    add.add_argument("--page-size", type=int, default=200, help="records per request")
+    remove = actions.add_parser("remove", help="delete a saved query and its stored results")
+    remove.add_argument("path", help="SQLite file holding the saved queries")
+    remove.add_argument("name", help="query name")
+    listing = actions.add_parser("list", help="list the saved queries")
+    listing.add_argument("path", help="SQLite file holding the saved queries")
+    check = actions.add_parser("check", help="report added, changed and removed records")
+    check.add_argument("path", help="SQLite file holding the saved queries")
+    check.add_argument("names", nargs="*", help="queries to check (default: all)")
+    check.add_argument("--force", action="store_true", help="check even if the release is unchanged")
+    check.add_argument("--workers", type=int, help="concurrent page requests")
+    watch.set_defaults(func=watch_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
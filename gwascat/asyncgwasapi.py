@@ -0,0 +1,206 @@
+import asyncio
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .endpoints import endpoint_methods
+from .gwasapi import BASE_URL, next_page_number, page_records
+from .http import BulkResult
+from .resilience import RetryPolicy
+
+
+@endpoint_methods(asynchronous=True)
+class AsyncGwasapi:
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        max_connections=100,
+        max_concurrency=100,
+        timeout=(5, 30),
+        rate_limiter=None,
+        retry=RetryPolicy(),
+        circuit_breaker=None,
+        client=None,
+        transport=None
+    ):
+        """
+        Asyncio client for the GWAS Catalog REST API v2, mirroring Gwasapi;
+        its endpoint methods are generated from gwascat.endpoints as well.
+
+        Requests go through one pooled httpx.AsyncClient holding at most
+        max_connections connections. max_concurrency is a global semaphore on
+        requests in flight across all tasks using this client, so thousands of
+        lookups can be scheduled at once without flooding the API.
+        rate_limiter, retry and circuit_breaker behave as in Gwasapi; a
+        TokenBucket can be shared between sync and async clients.
+
+        For tests, base_url can point at a local stub server, client replaces
+        the pooled client and transport is an httpx async transport.
+        Requires the optional httpx dependency.
+        """
+        if httpx is None:
+            raise ImportError("AsyncGwasapi requires httpx: pip install httpx")
+        self.base_url = base_url.rstrip("/")
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                transport=transport,
+            )
+        client.headers.update({"accept": "application/json"})
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+
+    async def aclose(self):
+        """
+        Close the pooled client and release its connections.
+        """
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _get(self, url, params=None):
+        """
+        Issue a GET request on the pooled client, bounded by the concurrency semaphore
+        and subject to rate limit, retries and circuit breaker.
+        Returns the decoded JSON body, raises httpx.HTTPStatusError on error status.
+        """
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            try:
+                async with self.semaphore:
+                    response = await self.client.get(url, params=params)
+            except httpx.TransportError:
+                self._record_outcome(False)
+                if self.retry is None or not self.retry.should_retry(attempt):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except BaseException as exc:
+                # a cancelled or failed circuit breaker trial must not keep the circuit open
+                self._record_outcome(False if isinstance(exc, Exception) else None)
+                raise
+            transient = response.status_code == 429 or response.status_code >= 500
+            self._record_outcome(not transient)
+            if self.retry is not None and self.retry.should_retry(attempt, response.status_code):
+                await asyncio.sleep(self.retry.delay(attempt, response.headers.get("retry-after")))
+                attempt += 1
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def _record_outcome(self, success):
+        if self.circuit_breaker is None:
+            return
+        if success is None:
+            self.circuit_breaker.release_trial()
+        elif success:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+
+    async def _iter_pages(self, fetch, params, prefetch=True):
+        """
+        Asynchronously yield records from every page of a list endpoint.
+        With prefetch, the next page is requested as a separate task while
+        the caller consumes the current one.
+        """
+        async def fetch_next(page):
+            number = next_page_number(page)
+            if number is not None:
+                return await fetch(**dict(params, page=number))
+            if page.get("page") is None:
+                href = page.get("_links", {}).get("next", {}).get("href")
+                if href:
+                    return await self._get(href)
+            return None
+
+        page = await fetch(**params)
+        while page is not None:
+            if not prefetch:
+                for record in page_records(page):
+                    yield record
+                page = await fetch_next(page)
+                continue
+            pending = asyncio.ensure_future(fetch_next(page))
+            try:
+                for record in page_records(page):
+                    yield record
+            except BaseException:
+                pending.cancel()
+                raise
+            page = await pending
+
+    async def _fetch_all(self, fetch, params):
+        """
+        Fetch every page of a list endpoint and return the merged records in page order.
+        The remaining pages are gathered concurrently once the first page
+        reveals the page count; the client semaphore bounds concurrency.
+        """
+        first = await fetch(**params)
+        records = list(page_records(first))
+        info = first.get("page")
+        if info is None:
+            return records
+        numbers = range(info.get("number", 0) + 1, info.get("totalPages", 0))
+        pages = await asyncio.gather(*(fetch(**dict(params, page=number)) for number in numbers))
+        for page in pages:
+            records.extend(page_records(page))
+        return records
+
+    async def _bulk(self, lookup, ids, max_workers=None):
+        """
+        Look up every distinct ID with lookup() in concurrent tasks.
+        Asynchronously yields a BulkResult(id, value, error) per ID as soon
+        as it completes; a failed lookup sets error to the exception instead
+        of raising. At most twice max_workers lookups (by default
+        max_concurrency) are pending at any time, so ids may be an
+        arbitrarily long iterator.
+        """
+        workers = max_workers or self.max_concurrency
+        seen = set()
+        pending = {}
+
+        def result(task):
+            id_ = pending.pop(task)
+            error = task.exception()
+            if error is not None:
+                return BulkResult(id_, None, error)
+            return BulkResult(id_, task.result(), None)
+
+        try:
+            for id_ in ids:
+                if id_ in seen:
+                    continue
+                seen.add(id_)
+                pending[asyncio.ensure_future(lookup(id_))] = id_
+                if len(pending) >= 2 * workers:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield result(task)
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield result(task)
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from urllib.parse import urlencode
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "stored_at"])
+
+
+def cache_key(url, params=None):
+    """
+    Build the cache key for a GET request: the URL followed by its sorted query parameters.
+    Parameters with None values are not sent and therefore not part of the key.
+    """
+    if not params:
+        return url
+    items = sorted((key, value) for key, value in params.items() if value is not None)
+    if not items:
+        return url
+    return f"{url}?{urlencode(items)}"
+
+
+class SQLiteCache:
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        """
+        Response cache stored in a single SQLite database file.
+        Entries older than ttl seconds are revalidated with a conditional request.
+        """
+        import sqlite3
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, stored_at REAL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CacheEntry(*row) if row is not None else None
+
+    def set(self, key, entry):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, *entry)
+            )
+
+    def get_meta(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_meta(self, name, value):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        self._db.close()
+
+
+class FileCache:
+    def __init__(self, directory, ttl=7 * 24 * 3600):
+        """
+        Response cache stored as one JSON file per entry in a directory.
+        Entries older than ttl seconds are revalidated with a conditional request.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _write(self, path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            data["body"].encode("utf-8"), data["etag"], data["last_modified"], data["stored_at"]
+        )
+
+    def set(self, key, entry):
+        data = entry._replace(body=entry.body.decode("utf-8"))._asdict()
+        self._write(self._path(key), data)
+
+    def get_meta(self, name):
+        try:
+            with open(os.path.join(self.directory, "meta.json"), encoding="utf-8") as f:
+                return json.load(f).get(name)
+        except (OSError, ValueError):
+            return None
+
+    def set_meta(self, name, value):
+        path = os.path.join(self.directory, "meta.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        meta[name] = value
+        self._write(path, meta)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and name != "meta.json":
+                os.remove(os.path.join(self.directory, name))
+
+    def close(self):
+        pass
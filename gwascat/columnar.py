@@ -0,0 +1,249 @@
+import math
+from array import array
+
+FLOAT = "float"
+INT = "int"
+CATEGORY = "category"
+STRING = "string"
+
+MISSING_INT = -1
+
+
+def field_value(record, *names):
+    """
+    Return the first non-None value among the given field names of a record.
+    Callers pass both the snake_case and camelCase spellings of a field.
+    """
+    for name in names:
+        value = record.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _to_float(value):
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).split()[0])
+    except (ValueError, IndexError):
+        return math.nan
+
+
+def _to_int(value):
+    if value is None:
+        return MISSING_INT
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_INT
+
+
+def _joined(values, key=None):
+    if values is None:
+        return None
+    if isinstance(values, str):
+        return values
+    if key is not None:
+        values = [field_value(value, *key) if isinstance(value, dict) else value for value in values]
+    values = [str(value) for value in values if value is not None]
+    return ",".join(values) if values else None
+
+
+def first_location(record):
+    """
+    Return (chromosome, position) of the first location of a record.
+    Locations are either "chr:pos" strings or dicts with chromosome name and position.
+    """
+    locations = field_value(record, "locations")
+    if not locations:
+        return None, None
+    first = locations[0]
+    if isinstance(first, str):
+        chromosome, _, position = first.partition(":")
+        return chromosome or None, position or None
+    return (
+        field_value(first, "chromosome_name", "chromosomeName"),
+        field_value(first, "chromosome_position", "chromosomePosition"),
+    )
+
+
+def _p_value(record):
+    value = field_value(record, "p_value", "pValue", "pvalue")
+    if value is not None:
+        return _to_float(value)
+    mantissa = field_value(record, "pvalue_mantissa", "pvalueMantissa")
+    exponent = field_value(record, "pvalue_exponent", "pvalueExponent")
+    if mantissa is None or exponent is None:
+        return math.nan
+    return _to_float(f"{mantissa}e{exponent}")
+
+
+def rs_id_of(record):
+    """
+    Return the rsId of a SNP or association record, taken from its effect allele if needed.
+    """
+    value = field_value(record, "rs_id", "rsId")
+    if value is not None:
+        return value
+    alleles = field_value(record, "snp_effect_allele", "snpEffectAllele", "strongest_risk_allele")
+    if not alleles:
+        return None
+    allele = alleles[0] if isinstance(alleles, list) else alleles
+    return str(allele).split("-")[0]
+
+
+ASSOCIATION_COLUMNS = [
+    ("association_id", INT, lambda r: field_value(r, "association_id", "associationId")),
+    ("accession_id", CATEGORY, lambda r: field_value(r, "accession_id", "accessionId")),
+    ("pubmed_id", CATEGORY, lambda r: field_value(r, "pubmed_id", "pubmedId")),
+    ("rs_id", STRING, rs_id_of),
+    ("chromosome", CATEGORY, lambda r: first_location(r)[0]),
+    ("bp_location", INT, lambda r: first_location(r)[1]),
+    ("p_value", FLOAT, _p_value),
+    ("beta", FLOAT, lambda r: field_value(r, "beta")),
+    ("or_value", FLOAT, lambda r: field_value(r, "or_value", "orValue")),
+    ("risk_frequency", FLOAT, lambda r: field_value(r, "risk_frequency", "riskFrequency")),
+    ("mapped_gene", CATEGORY, lambda r: _joined(field_value(r, "mapped_genes", "mappedGenes"))),
+    ("efo_id", CATEGORY, lambda r: _joined(field_value(r, "efo_traits", "efoTraits"), ("efo_id", "efoId"))),
+    ("efo_trait", CATEGORY, lambda r: _joined(field_value(r, "efo_traits", "efoTraits"), ("efo_trait", "efoTrait"))),
+]
+
+SNP_COLUMNS = [
+    ("rs_id", STRING, rs_id_of),
+    ("chromosome", CATEGORY, lambda r: first_location(r)[0]),
+    ("bp_location", INT, lambda r: first_location(r)[1]),
+    ("functional_class", CATEGORY, lambda r: field_value(r, "functional_class", "functionalClass")),
+    ("mapped_gene", CATEGORY, lambda r: _joined(field_value(r, "mapped_genes", "mappedGenes"))),
+    ("maf", FLOAT, lambda r: field_value(r, "maf")),
+]
+
+
+class ColumnarBuilder:
+    def __init__(self, columns):
+        """
+        Accumulate flattened records into typed columns.
+
+        Floats and ints are held in compact stdlib arrays (missing values are
+        NaN and MISSING_INT), category columns are dictionary-encoded as int32
+        codes into a per-column list of distinct strings, so the nested
+        record dicts can be dropped page by page.
+        """
+        self.columns = columns
+        self.length = 0
+        self._data = {}
+        self._categories = {}
+        self._codes = {}
+        for name, kind, _ in columns:
+            if kind == FLOAT:
+                self._data[name] = array("d")
+            elif kind == INT:
+                self._data[name] = array("q")
+            elif kind == CATEGORY:
+                self._data[name] = array("i")
+                self._categories[name] = []
+                self._codes[name] = {}
+            else:
+                self._data[name] = []
+
+    def add(self, record):
+        for name, kind, getter in self.columns:
+            value = getter(record)
+            if kind == FLOAT:
+                self._data[name].append(_to_float(value))
+            elif kind == INT:
+                self._data[name].append(_to_int(value))
+            elif kind == CATEGORY:
+                self._data[name].append(self._encode(name, value))
+            else:
+                self._data[name].append(None if value is None else str(value))
+        self.length += 1
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def _encode(self, name, value):
+        if value is None:
+            return -1
+        value = str(value)
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[name])
+            self._categories[name].append(value)
+        return code
+
+    def to_numpy(self):
+        """
+        Return (array, categories): a NumPy structured array with one field per
+        column and a dict mapping each category column to its list of values.
+        Category fields hold int32 codes, -1 for missing.
+        """
+        import numpy as np
+
+        dtypes = {FLOAT: np.float64, INT: np.int64, CATEGORY: np.int32, STRING: object}
+        dtype = [(name, dtypes[kind]) for name, kind, _ in self.columns]
+        result = np.empty(self.length, dtype=dtype)
+        for name, kind, _ in self.columns:
+            if kind == STRING:
+                result[name] = self._data[name]
+            else:
+                result[name] = np.frombuffer(self._data[name], dtype=dtypes[kind])
+        return result, {name: list(values) for name, values in self._categories.items()}
+
+    def to_arrow(self):
+        """
+        Return a pyarrow.Table; category columns become dictionary arrays and
+        missing values become nulls.
+        """
+        import pyarrow as pa
+
+        arrays = []
+        for name, kind, _ in self.columns:
+            data = self._data[name]
+            if kind == FLOAT:
+                arrays.append(pa.array(data, type=pa.float64(), from_pandas=True))
+            elif kind == INT:
+                arrays.append(pa.array([None if v == MISSING_INT else v for v in data], type=pa.int64()))
+            elif kind == CATEGORY:
+                indices = pa.array([None if v < 0 else v for v in data], type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(self._categories[name], pa.string())))
+            else:
+                arrays.append(pa.array(data, type=pa.string()))
+        return pa.table(arrays, names=[name for name, _, _ in self.columns])
+
+    def to_pandas(self):
+        """
+        Return a pandas.DataFrame with categorical dtype for category columns.
+        """
+        import pandas as pd
+
+        frame = {}
+        for name, kind, _ in self.columns:
+            data = self._data[name]
+            if kind == CATEGORY:
+                frame[name] = pd.Categorical.from_codes(list(data), self._categories[name])
+            elif kind == INT:
+                frame[name] = pd.array([None if v == MISSING_INT else v for v in data], dtype="Int64")
+            else:
+                frame[name] = list(data)
+        return pd.DataFrame(frame)
+
+
+def materialize(records, columns, format="numpy"):
+    """
+    Flatten records into a columnar result.
+    format is "numpy" (structured array, categories), "arrow" or "pandas".
+    """
+    builder = ColumnarBuilder(columns).extend(records)
+    if format == "numpy":
+        return builder.to_numpy()
+    if format == "arrow":
+        return builder.to_arrow()
+    if format == "pandas":
+        return builder.to_pandas()
+    raise ValueError(f"unknown columnar format: {format!r}")
@@ -0,0 +1,203 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = " \t\n\r"
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+# characters that may continue a number split across chunks ("0." or "-2.5e")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+
+def get_decoder(name=None):
+    """
+    Return a function decoding JSON bytes into Python objects.
+
+    name selects "orjson", "ujson" or "json"; by default the fastest
+    installed backend is used, falling back to the standard library.
+    """
+    if name in (None, "orjson"):
+        try:
+            import orjson
+            return orjson.loads
+        except ImportError:
+            if name is not None:
+                raise
+    if name in (None, "ujson"):
+        try:
+            import ujson
+            return ujson.loads
+        except ImportError:
+            if name is not None:
+                raise
+    if name in (None, "json"):
+        return json.loads
+    raise ValueError(f"unknown JSON decoder: {name!r}")
+
+
+class PageStream:
+    """
+    Incremental parser for one HAL page read from a stream of byte chunks.
+
+    Iterating yields the records of the _embedded list one at a time as soon
+    as each is complete, so only the current record and one chunk are held
+    in memory. The remaining top-level members ("page", "_links") are
+    available as attributes once iteration has finished.
+
+    With raw set, records are yielded as their undecoded JSON text, for
+    gwascat.models record classes that decode a record on first access.
+    """
+
+    def __init__(self, chunks, close=None, raw=False):
+        self._chunks = iter(chunks)
+        self._close = close
+        self.raw = raw
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self.members = {}
+
+    @property
+    def page(self):
+        return self.members.get("page")
+
+    @property
+    def links(self):
+        return self.members.get("_links", {})
+
+    def _more(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            raise ValueError("unexpected end of JSON page")
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._more()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"expected {char!r} at {self._buffer[self._pos:self._pos + 20]!r}")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # the value may continue in the next chunk
+                self._more()
+                continue
+            if isinstance(value, (int, float)) and _NUMBER_TAIL.match(self._buffer, end):
+                # a number at the end of the buffer, or followed only by what
+                # could be its fraction or exponent, may continue in the next chunk
+                try:
+                    self._more()
+                    continue
+                except ValueError:
+                    pass
+            self._pos = end
+            return value
+
+    def _raw_value(self):
+        """
+        Return the JSON text of the object or array at the current position without decoding it.
+        Only strings and brackets are scanned; other values are decoded and re-encoded.
+        """
+        if self._peek() not in "{[":
+            return json.dumps(self._value())
+        depth = 0
+        in_string = False
+        offset = 0
+        while True:
+            buffer = self._buffer
+            index = self._pos + offset
+            while True:
+                if in_string:
+                    match = _STRING_END.search(buffer, index)
+                    if match is None:
+                        index = len(buffer)
+                        break
+                    if match.group() == "\\":
+                        if match.end() >= len(buffer):
+                            # the escaped character is in the next chunk
+                            index = match.start()
+                            break
+                        index = match.end() + 1
+                        continue
+                    in_string = False
+                    index = match.end()
+                    continue
+                match = _STRUCTURE.search(buffer, index)
+                if match is None:
+                    index = len(buffer)
+                    break
+                char = match.group()
+                index = match.end()
+                if char == '"':
+                    in_string = True
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        text = buffer[self._pos:index]
+                        self._pos = index
+                        return text
+            offset = index - self._pos
+            self._more()
+
+    def _members(self):
+        """
+        Yield the keys of a JSON object member by member, leaving the position at each value.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"unexpected {char!r} in JSON object")
+
+    def _records(self):
+        for _ in self._members():
+            if self._peek() != "[":
+                self._value()
+                continue
+            self._pos += 1
+            if self._peek() == "]":
+                self._pos += 1
+                continue
+            while True:
+                yield self._raw_value() if self.raw else self._value()
+                char = self._peek()
+                self._pos += 1
+                if char == "]":
+                    break
+                if char != ",":
+                    raise ValueError(f"unexpected {char!r} in JSON array")
+
+    def __iter__(self):
+        try:
+            for key in self._members():
+                if key == "_embedded":
+                    yield from self._records()
+                else:
+                    self.members[key] = self._value()
+        finally:
+            if self._close is not None:
+                self._close()
@@ -0,0 +1,420 @@
+import inspect
+import re
+
+# entity type -> (singular, plural) used in generated docstrings
+ENTITY_LABELS = {
+    "metadata": ("metadata", "metadata"),
+    "study": ("study", "studies"),
+    "association": ("association", "associations"),
+    "publication": ("publication", "publications"),
+    "efo_trait": ("EFO trait", "EFO traits"),
+    "snp": ("SNP", "SNPs"),
+    "genomic_context": ("genomic context", "genomic contexts"),
+    "gene": ("gene", "genes"),
+    "locus": ("locus", "loci"),
+    "body_of_work": ("body of work", "body of works"),
+    "unpublished_study": ("unpublished study", "unpublished studies"),
+    "unpublished_ancestry": ("unpublished ancestry", "unpublished ancestries"),
+}
+
+
+def camel_case(name):
+    head, *rest = name.split("_")
+    return head + "".join(part.capitalize() for part in rest)
+
+
+class Endpoint:
+    __slots__ = ("name", "path", "args", "params", "paginated", "lookup", "entity", "summary", "template")
+
+    def __init__(self, name, path, params=(), paginated=False, lookup=False, entity=None, summary=None):
+        """
+        Declaration of one GET endpoint of the GWAS Catalog REST API v2.
+
+        path is the URL below the base URL, with {name} placeholders for the
+        positional arguments of the method. params lists its optional query
+        parameters by Python name; each is sent under its camelCase API name
+        unless given as a (python_name, api_name) pair. paginated endpoints
+        get iter_*/get_all_* methods and stream support, lookup endpoints
+        return one entity by ID and go through the client memo. entity is a
+        key of ENTITY_LABELS and summary the first docstring line.
+        """
+        self.name = name
+        self.path = path
+        self.args = tuple(re.findall(r"{(\w+)}", path))
+        self.params = tuple(
+            (param, camel_case(param)) if isinstance(param, str) else tuple(param) for param in params
+        )
+        self.paginated = paginated
+        self.lookup = lookup
+        self.entity = entity
+        self.summary = summary
+        # positional format string, so building the URL is a single str.format call
+        self.template = re.sub(r"{\w+}", "{}", path)
+
+    def __repr__(self):
+        return f"Endpoint({self.name!r}, {self.path!r})"
+
+    @property
+    def suffix(self):
+        return self.name[len("get_"):]
+
+    def query(self, values):
+        """
+        Return (path, query parameters) of a call with the given Python
+        argument values, as the generated request method sends it.
+        """
+        path = self.template.format(*[values[arg] for arg in self.args]) if self.args else self.template
+        params = {api_name: values[param] for param, api_name in self.params if values.get(param) is not None}
+        return path, params
+
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in (
+    Endpoint(
+        "get_metadata", "/metadata", entity="metadata",
+        summary="Fetch metadata from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_studies", "/studies",
+        (
+            "pubmed_id", "disease_trait", "full_pvalue_set", "efo_id", "efo_trait", "accession_id",
+            "cohort", "gxe", "ancestral_group", "no_of_individuals", "show_child_trait", "mapped_gene",
+            "extended_geneset", "sort", "direction", "page", "size",
+        ),
+        paginated=True, entity="study",
+        summary="Fetch studies from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_study", "/studies/{accession_id}", lookup=True, entity="study",
+        summary="Fetch a single study from the GWAS Catalog API by accession ID.",
+    ),
+    Endpoint(
+        "get_associations", "/associations",
+        (
+            "pubmed_id", "rs_id", "full_pvalue_set", "accession_id", "efo_trait", "efo_id",
+            "show_child_trait", "mapped_gene", "extended_geneset", "sort", "direction", "page", "size",
+        ),
+        paginated=True, entity="association",
+        summary="Fetch associations from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_association", "/associations/{association_id}", lookup=True, entity="association",
+        summary="Fetch a single association from the GWAS Catalog API by association ID.",
+    ),
+    Endpoint(
+        "get_publications", "/publications",
+        ("pubmed_id", "title", "first_author", "sort", "direction", "page", "size"),
+        paginated=True, entity="publication",
+        summary="Fetch publications from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_publication", "/publications/{pubmed_id}", lookup=True, entity="publication",
+        summary="Fetch a single publication from the GWAS Catalog API by pubmed_id.",
+    ),
+    Endpoint(
+        "get_efo_traits", "/efo-traits",
+        (
+            "efo_trait", "uri", "efo_id", "pubmed_id", "mapped_gene", "extended_geneset",
+            "sort", "direction", "page", "size",
+        ),
+        paginated=True, entity="efo_trait",
+        summary="Fetch EFO traits from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_efo_trait", "/efo-traits/{efo_id}", lookup=True, entity="efo_trait",
+        summary="Fetch a single EFO trait from the GWAS Catalog API by efo_id.",
+    ),
+    Endpoint(
+        "get_snps", "/single-nucleotide-polymorphisms",
+        (
+            "rs_id", "bp_location", "bp_start", "bp_end", "pubmed_id", "chromosome", "mapped_gene",
+            "extended_geneset", "sort", "direction", "page", "size",
+        ),
+        paginated=True, entity="snp",
+        summary="Fetch SNPs from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_snp", "/single-nucleotide-polymorphisms/{rs_id}", lookup=True, entity="snp",
+        summary="Fetch a single SNP from the GWAS Catalog API by rs_id.",
+    ),
+    Endpoint(
+        "get_genomic_contexts", "/single-nucleotide-polymorphisms/{rs_id}/genomic-contexts",
+        ("sort", "direction"), entity="genomic_context",
+        summary="Fetch all genomic contexts for a SNP from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_genomic_context",
+        "/single-nucleotide-polymorphisms/{rs_id}/genomic-contexts/{genomic_context_id}",
+        lookup=True, entity="genomic_context",
+        summary="Fetch a single genomic context for a SNP from the GWAS Catalog API by rs_id and genomic_context_id.",
+    ),
+    Endpoint(
+        "get_genes", "/genes", ("page", "size", "sort"), paginated=True, entity="gene",
+        summary="Fetch genes from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_gene", "/genes/{gene_name}", lookup=True, entity="gene",
+        summary="Fetch a single gene from the GWAS Catalog API by gene_name.",
+    ),
+    Endpoint(
+        "get_loci", "/associations/{association_id}/loci", entity="locus",
+        summary="Fetch all loci for an association from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_locus", "/associations/{association_id}/loci/{locus_id}", lookup=True, entity="locus",
+        summary="Fetch a single locus for an association from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_body_of_works", "/body-of-works", ("title", "first_author", "page", "size", "sort"),
+        paginated=True, entity="body_of_work",
+        summary="Fetch all body of works from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_body_of_work", "/body-of-works/{bow_id}", lookup=True, entity="body_of_work",
+        summary="Fetch a single body of work from the GWAS Catalog API by bow_id.",
+    ),
+    Endpoint(
+        "get_unpublished_studies_for_body_of_work", "/body-of-works/{bow_id}/unpublished-studies",
+        ("page", "size", "sort"), paginated=True, entity="unpublished_study",
+        summary="Fetch all unpublished studies for a body of work from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_unpublished_studies", "/unpublished-studies",
+        (
+            "disease_trait", "accession_id", "title", "first_author", "cohort",
+            "sort", "direction", "page", "size",
+        ),
+        paginated=True, entity="unpublished_study",
+        summary="Fetch all unpublished studies from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_unpublished_study", "/unpublished-studies/{accession_id}", lookup=True, entity="unpublished_study",
+        summary="Fetch a single unpublished study from the GWAS Catalog API by accession_id.",
+    ),
+    Endpoint(
+        "get_unpublished_ancestries", "/unpublished-studies/{accession_id}/unpublished-ancestries",
+        ("sort", "direction"), entity="unpublished_ancestry",
+        summary="Fetch all unpublished ancestries for an unpublished study from the GWAS Catalog API.",
+    ),
+    Endpoint(
+        "get_unpublished_ancestry",
+        "/unpublished-studies/{accession_id}/unpublished-ancestries/{ancestry_id}",
+        lookup=True, entity="unpublished_ancestry",
+        summary="Fetch a single unpublished ancestry for an unpublished study from the GWAS Catalog API.",
+    ),
+)}
+
+
+def bulk_pairs():
+    """
+    Return (list endpoint, lookup endpoint) pairs of the entities that can be
+    fetched in bulk: a top-level paginated list and a lookup by a single ID.
+    """
+    lists = {e.entity: e for e in ENDPOINTS.values() if e.paginated and not e.args}
+    return [
+        (lists[e.entity], e) for e in ENDPOINTS.values()
+        if e.lookup and len(e.args) == 1 and e.entity in lists
+    ]
+
+
+_REQUIRED = object()
+
+
+def _binder(name, parameters, extra=False):
+    """
+    Return bind(args, kwargs) -> (values, rest) for a generated method taking
+    the (name, default) parameters positionally or by keyword, with
+    _REQUIRED marking parameters without default. Unknown keywords go to
+    rest if extra is set and raise TypeError otherwise, like a def would.
+    """
+    names = tuple(parameter for parameter, _ in parameters)
+    defaults = dict(parameters)
+    required = [parameter for parameter, default in parameters if default is _REQUIRED]
+
+    def bind(args, kwargs):
+        if len(args) > len(names):
+            raise TypeError(f"{name}() takes {len(names)} positional arguments but {len(args)} were given")
+        values = dict(zip(names, args))
+        rest = {}
+        for key, value in kwargs.items():
+            if key not in defaults:
+                if not extra:
+                    raise TypeError(f"{name}() got an unexpected keyword argument {key!r}")
+                rest[key] = value
+            elif key in values:
+                raise TypeError(f"{name}() got multiple values for argument {key!r}")
+            else:
+                values[key] = value
+        for parameter in required:
+            if parameter not in values:
+                raise TypeError(f"{name}() missing required argument: {parameter!r}")
+        return values, rest
+
+    return bind
+
+
+def _signature(parameters, extra=False):
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    signature = [inspect.Parameter("self", kind)]
+    for name, default in parameters:
+        signature.append(inspect.Parameter(name, kind, default=inspect.Parameter.empty if default is _REQUIRED else default))
+    if extra:
+        signature.append(inspect.Parameter("params", inspect.Parameter.VAR_KEYWORD))
+    return inspect.Signature(signature)
+
+
+def _finish(method, name, parameters, doc, extra=False):
+    method.__name__ = name
+    method.__doc__ = doc
+    method.__signature__ = _signature(parameters, extra)
+    return method
+
+
+def _request_method(endpoint, asynchronous):
+    parameters = [(arg, _REQUIRED) for arg in endpoint.args] + [(param, None) for param, _ in endpoint.params]
+    if endpoint.paginated and not asynchronous:
+        parameters.append(("stream", False))
+    bind = _binder(endpoint.name, parameters)
+    query, memoize = endpoint.query, endpoint.lookup
+    sends_params = bool(endpoint.params)
+
+    def request(bound):
+        values, _ = bound
+        path, params = query(values)
+        return path, params if sends_params else None, values.get("stream", False)
+
+    lines = [endpoint.summary]
+    if endpoint.paginated:
+        lines.append("Only parameters with non-None values are sent as query parameters.")
+        if asynchronous:
+            lines.append("Returns the JSON response as a Python dict.")
+        else:
+            lines.append("Returns the JSON response as a Python dict, or with stream=True a")
+            lines.append("gwascat.decoding.PageStream yielding records while the page downloads.")
+    else:
+        lines.append("Returns the JSON response as a Python dict.")
+    if endpoint.lookup:
+        lines.append("Raises HTTPError if not found or on error.")
+
+    if asynchronous:
+        async def method(self, *args, **kwargs):
+            path, params, _ = request(bind(args, kwargs))
+            return await self._get(self.base_url + path, params)
+    else:
+        def method(self, *args, **kwargs):
+            path, params, stream = request(bind(args, kwargs))
+            return self._get(self.base_url + path, params, memoize=memoize, stream=stream)
+
+    return _finish(method, endpoint.name, parameters, "\n".join(lines))
+
+
+def _iter_method(endpoint, asynchronous):
+    name = "iter_" + endpoint.suffix
+    parameters = [(arg, _REQUIRED) for arg in endpoint.args] + [("prefetch", True)]
+    if not asynchronous:
+        parameters.append(("model", None))
+    bind = _binder(name, parameters, extra=True)
+    args, fetch_name = endpoint.args, endpoint.name
+    singular, plural = ENTITY_LABELS[endpoint.entity]
+
+    if asynchronous:
+        def method(self, *values, **kwargs):
+            bound, params = bind(values, kwargs)
+            params.update((arg, bound[arg]) for arg in args)
+            return self._iter_pages(getattr(self, fetch_name), params, bound.get("prefetch", True))
+    else:
+        def method(self, *values, **kwargs):
+            bound, params = bind(values, kwargs)
+            params.update((arg, bound[arg]) for arg in args)
+            return self._iter_pages(
+                getattr(self, fetch_name), params, bound.get("prefetch", True), bound.get("model")
+            )
+
+    doc = (
+        f"Iterate over all {plural} matching the {fetch_name} parameters.\n"
+        f"{'Asynchronously yields' if asynchronous else 'Yields'} one {singular} dict at a time, "
+        "fetching pages as needed."
+    )
+    if not asynchronous:
+        doc += (
+            "\nWith model, a gwascat.models class, pages are streamed and each record is\n"
+            "yielded as a model instance decoded on first field access."
+        )
+    return _finish(method, name, parameters, doc, extra=True)
+
+
+def _all_method(endpoint, asynchronous):
+    name = "get_all_" + endpoint.suffix
+    parameters = [(arg, _REQUIRED) for arg in endpoint.args]
+    if not asynchronous:
+        parameters.append(("max_workers", None))
+    bind = _binder(name, parameters, extra=True)
+    args, fetch_name = endpoint.args, endpoint.name
+    plural = ENTITY_LABELS[endpoint.entity][1]
+
+    def arguments(values, kwargs):
+        bound, params = bind(values, kwargs)
+        params.update((arg, bound[arg]) for arg in args)
+        return params, bound.get("max_workers")
+
+    if asynchronous:
+        async def method(self, *values, **kwargs):
+            params, _ = arguments(values, kwargs)
+            return await self._fetch_all(getattr(self, fetch_name), params)
+    else:
+        def method(self, *values, **kwargs):
+            params, max_workers = arguments(values, kwargs)
+            return self._fetch_all(getattr(self, fetch_name), params, max_workers)
+
+    doc = (
+        f"Fetch all {plural} matching the {fetch_name} parameters, "
+        f"pages {'concurrently' if asynchronous else 'in parallel'}.\n"
+        "Returns the records of every page as one list, in page order."
+    )
+    return _finish(method, name, parameters, doc, extra=True)
+
+
+def _bulk_method(list_endpoint, lookup_endpoint):
+    name = list_endpoint.name + "_bulk"
+    ids = lookup_endpoint.args[0] + "s"
+    parameters = [(ids, _REQUIRED), ("max_workers", None)]
+    bind = _binder(name, parameters)
+    lookup_name = lookup_endpoint.name
+    plural = ENTITY_LABELS[lookup_endpoint.entity][1]
+
+    def method(self, *args, **kwargs):
+        values, _ = bind(args, kwargs)
+        return self._bulk(getattr(self, lookup_name), values[ids], values.get("max_workers"))
+
+    doc = (
+        f"Fetch many {plural} by {lookup_endpoint.args[0]} concurrently, skipping duplicates.\n"
+        "Yields BulkResult(id, value, error) tuples in completion order."
+    )
+    return _finish(method, name, parameters, doc)
+
+
+def endpoint_methods(asynchronous=False):
+    """
+    Class decorator adding the methods generated from ENDPOINTS to a client:
+    one request method per endpoint, iter_* and get_all_* per paginated
+    endpoint and get_*_bulk per bulk_pairs() entity. Each method's URL
+    template and parameter map are built once here, so a call only binds
+    its arguments. The client provides _get, _iter_pages, _fetch_all and
+    _bulk; methods it defines itself are left in place.
+    """
+    def decorate(cls):
+        methods = []
+        for endpoint in ENDPOINTS.values():
+            methods.append(_request_method(endpoint, asynchronous))
+            if endpoint.paginated:
+                methods.append(_iter_method(endpoint, asynchronous))
+                methods.append(_all_method(endpoint, asynchronous))
+        for list_endpoint, lookup_endpoint in bulk_pairs():
+            methods.append(_bulk_method(list_endpoint, lookup_endpoint))
+        for method in methods:
+            if method.__name__ not in cls.__dict__:
+                method.__qualname__ = f"{cls.__name__}.{method.__name__}"
+                method.__module__ = cls.__module__
+                setattr(cls, method.__name__, method)
+        return cls
+
+    return decorate
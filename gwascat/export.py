@@ -0,0 +1,269 @@
+import glob
+import gzip
+import json
+import os
+from collections import deque
+
+from .columnar import ASSOCIATION_COLUMNS, SNP_COLUMNS, STRING, ColumnarBuilder
+from .gwasapi import page_records
+from .mirror import ENTITIES, record_id, release_of
+
+FORMATS = ("ndjson", "parquet")
+
+# format -> (default compression, supported compressions)
+COMPRESSIONS = {
+    "ndjson": ("gzip", ("gzip", "none")),
+    "parquet": ("zstd", ("zstd", "snappy", "gzip", "lz4", "brotli", "none")),
+}
+
+# typed Parquet columns per entity; other entities are written as ID + JSON record
+PARQUET_COLUMNS = {
+    "associations": ASSOCIATION_COLUMNS,
+    "snps": SNP_COLUMNS,
+}
+
+
+def _json_columns(id_fields):
+    return [
+        ("id", STRING, lambda r: record_id(r, id_fields)),
+        ("record", STRING, lambda r: json.dumps(r, separators=(",", ":"))),
+    ]
+
+
+def _encode_ndjson(records, compression):
+    data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode("utf-8")
+    # each batch is a complete gzip member; concatenated members form a valid gzip file
+    return gzip.compress(data) if compression == "gzip" else data
+
+
+def _write_parquet(records, columns, path, compression):
+    import pyarrow.parquet as pq
+
+    table = ColumnarBuilder(columns).extend(records).to_arrow()
+    pq.write_table(table, path, compression=compression, row_group_size=max(1, table.num_rows))
+
+
+class Exporter:
+    def __init__(
+        self,
+        api,
+        entity,
+        path,
+        format="ndjson",
+        page_size=200,
+        row_group_size=10000,
+        compression=None,
+        max_workers=None,
+        progress=None,
+        **params
+    ):
+        """
+        Stream every record of a list query into an NDJSON or Parquet file.
+
+        entity is one of gwascat.mirror.ENTITIES and params are passed to its
+        Gwasapi list method. Pages are fetched concurrently by up to
+        max_workers threads with a bounded number in flight, collected in page
+        order into batches of at least row_group_size records, encoded and
+        compressed on a separate thread and written as they complete, so
+        memory stays bounded by a few batches regardless of the result size.
+
+        NDJSON is written to path, one gzip member per batch by default.
+        Parquet is written as a directory of part files, one row group each,
+        readable as one dataset with pyarrow or pandas. After every written
+        batch the next page is recorded in path + ".state"; run() on an
+        interrupted export resumes from there, unless the query, options
+        or catalog release have changed. HAL _links are dropped.
+        """
+        if entity not in ENTITIES:
+            raise ValueError(f"unknown entity {entity!r}, expected one of {', '.join(ENTITIES)}")
+        if format not in FORMATS:
+            raise ValueError(f"unknown export format {format!r}, expected one of {', '.join(FORMATS)}")
+        default, supported = COMPRESSIONS[format]
+        compression = compression or default
+        if compression not in supported:
+            raise ValueError(f"{format} supports compression {', '.join(supported)}, not {compression!r}")
+        self.api = api
+        self.entity = entity
+        self.path = path
+        self.format = format
+        self.page_size = page_size
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.max_workers = max_workers or api.max_workers
+        self.progress = progress
+        self.params = params
+        method, id_fields = ENTITIES[entity]
+        self.fetch = getattr(api, method)
+        self.columns = PARQUET_COLUMNS.get(entity) or _json_columns(id_fields)
+        self.state_path = path + ".state"
+
+    def _options(self):
+        return {
+            "entity": self.entity,
+            "format": self.format,
+            "compression": self.compression,
+            "page_size": self.page_size,
+            "params": self.params,
+        }
+
+    def _load_state(self, release):
+        """
+        Return the saved state of an interrupted export of the same query, or None.
+        """
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("options") != json.loads(json.dumps(self._options())) or state.get("release") != release:
+            return None
+        return state
+
+    def _save_state(self, state):
+        temporary = self.state_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.state_path)
+
+    def _open_output(self, state):
+        if self.format == "parquet":
+            os.makedirs(self.path, exist_ok=True)
+            if state["parts"] == 0:
+                for name in glob.glob(os.path.join(self.path, "part-*.parquet")):
+                    os.remove(name)
+            return None
+        if state["offset"] == 0 or not os.path.exists(self.path):
+            return open(self.path, "wb")
+        f = open(self.path, "r+b")
+        # drop anything written after the last recorded batch
+        f.truncate(state["offset"])
+        f.seek(state["offset"])
+        return f
+
+    def _pages(self, start, first):
+        """
+        Yield (number, page) from first on in page order, keeping at most
+        2 * max_workers page requests in flight.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        yield start, first
+        info = first.get("page")
+        if info is None:
+            return
+        numbers = iter(range(start + 1, info.get("totalPages", 0)))
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for number in numbers:
+                pending.append((number, executor.submit(self._fetch_page, number)))
+                if len(pending) >= 2 * self.max_workers:
+                    break
+            while pending:
+                number, future = pending.popleft()
+                page = future.result()
+                following = next(numbers, None)
+                if following is not None:
+                    pending.append((following, executor.submit(self._fetch_page, following)))
+                yield number, page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_page(self, number):
+        return self.fetch(**dict(self.params, page=number, size=self.page_size))
+
+    def _batches(self, pages):
+        """
+        Group pages into (last page number, total pages, records) batches of
+        at least row_group_size records.
+        """
+        records = []
+        for number, page in pages:
+            for record in page_records(page):
+                record.pop("_links", None)
+                records.append(record)
+            total = (page.get("page") or {}).get("totalPages", number + 1)
+            if len(records) >= self.row_group_size or number + 1 >= total:
+                yield number, total, records
+                records = []
+        if records:
+            yield number, total, records
+
+    def _encode(self, part, records):
+        if self.format == "ndjson":
+            return _encode_ndjson(records, self.compression)
+        name = os.path.join(self.path, f"part-{part:05d}.parquet")
+        compression = None if self.compression == "none" else self.compression
+        _write_parquet(records, self.columns, name + ".tmp", compression)
+        return name
+
+    def _write(self, output, state, number, records, encoded):
+        if self.format == "ndjson":
+            output.write(encoded)
+            output.flush()
+            os.fsync(output.fileno())
+            state["offset"] = output.tell()
+        else:
+            os.replace(encoded + ".tmp", encoded)
+            state["parts"] += 1
+        state["next_page"] = number + 1
+        state["rows"] += records
+        self._save_state(state)
+
+    def run(self):
+        """
+        Run or resume the export. Returns a dict with the number of exported
+        "rows" and "pages", and the page the export "resumed" from (0 if
+        it started from scratch). The state file is removed on completion.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        release = release_of(self.api.get_metadata())
+        state = self._load_state(release)
+        if state is None:
+            state = {"options": self._options(), "release": release, "next_page": 0, "rows": 0, "offset": 0, "parts": 0}
+            self._save_state(state)
+        resumed = state["next_page"]
+        first = self._fetch_page(resumed)
+        total = (first.get("page") or {}).get("totalPages", 1)
+        output = self._open_output(state)
+        encoder = ThreadPoolExecutor(max_workers=2)
+        pending = deque()
+        parts = state["parts"]
+        try:
+            if resumed < total:
+                for number, total, records in self._batches(self._pages(resumed, first)):
+                    pending.append((number, total, len(records), encoder.submit(self._encode, parts, records)))
+                    parts += 1
+                    # at most two encoded batches wait for the writer
+                    while len(pending) > 2 or (pending and pending[0][3].done()):
+                        self._commit(output, state, pending.popleft())
+            while pending:
+                self._commit(output, state, pending.popleft())
+        finally:
+            for *_, future in pending:
+                future.cancel()
+            encoder.shutdown(wait=True)
+            if output is not None:
+                output.close()
+        os.remove(self.state_path)
+        return {"rows": state["rows"], "pages": total, "resumed": resumed}
+
+    def _commit(self, output, state, batch):
+        number, total, rows, future = batch
+        self._write(output, state, number, rows, future.result())
+        if self.progress is not None:
+            self.progress(self.entity, number, total)
+
+
+def export(api, entity, path, format="ndjson", page_size=200, row_group_size=10000,
+           compression=None, max_workers=None, progress=None, **params):
+    """
+    Export every record of a list query to NDJSON or Parquet; see Exporter.
+    """
+    return Exporter(
+        api, entity, path, format, page_size, row_group_size,
+        compression, max_workers, progress, **params
+    ).run()
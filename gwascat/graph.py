@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .columnar import field_value
+from .gwasapi import page_records
+
+LEVELS = ("study", "association", "locus", "snp", "genomic_context")
+
+
+class Node:
+    __slots__ = ("kind", "id", "data", "children", "parents")
+
+    def __init__(self, kind, id_, data):
+        self.kind = kind
+        self.id = id_
+        self.data = data
+        self.children = []
+        self.parents = []
+
+    def __repr__(self):
+        return f"Node({self.kind!r}, {self.id!r}, children={len(self.children)})"
+
+
+class Graph:
+    def __init__(self, root):
+        self.root = root
+        self.nodes = {(root.kind, root.id): root}
+
+    def nodes_of(self, kind):
+        """
+        Return all nodes of one kind ("association", "snp", ...).
+        """
+        return [node for (node_kind, _), node in self.nodes.items() if node_kind == kind]
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def _risk_allele_rs_ids(locus):
+    rs_ids = []
+    for allele in field_value(locus, "strongest_risk_alleles", "strongestRiskAlleles") or []:
+        if isinstance(allele, dict):
+            allele = field_value(allele, "risk_allele_name", "riskAlleleName")
+        if allele:
+            rs_ids.append(str(allele).split("-")[0])
+    return rs_ids
+
+
+def _association_children(api, node):
+    for record in api.iter_associations(accession_id=node.id):
+        yield str(field_value(record, "association_id", "associationId")), record
+
+
+def _locus_children(api, node):
+    for index, record in enumerate(page_records(api.get_loci(node.id))):
+        locus_id = field_value(record, "locus_id", "locusId")
+        yield f"{node.id}/{locus_id if locus_id is not None else index}", record
+
+
+def _snp_children(api, node):
+    for rs_id in _risk_allele_rs_ids(node.data):
+        yield rs_id, None
+
+
+def _genomic_context_children(api, node):
+    for index, record in enumerate(page_records(api.get_genomic_contexts(node.id))):
+        context_id = field_value(record, "genomic_context_id", "genomicContextId", "id")
+        yield f"{node.id}/{context_id if context_id is not None else index}", record
+
+
+# child kind -> function yielding (child id, child data or None) for a parent node
+CHILDREN = {
+    "association": _association_children,
+    "locus": _locus_children,
+    "snp": _snp_children,
+    "genomic_context": _genomic_context_children,
+}
+
+# kinds whose data is fetched by ID once the child is first reached
+LOOKUPS = {
+    "study": "get_study",
+    "association": "get_association",
+    "snp": "get_snp",
+}
+
+
+def expand(api, kind, id_, depth=None, path=None, max_workers=None):
+    """
+    Expand a root entity into a linked Graph of related records.
+
+    The relationship chain is study -> association -> locus -> snp ->
+    genomic_context. path is the sequence of kinds to follow below the root
+    (it must continue the chain from the root kind), or depth the number of
+    levels to follow; by default the whole chain is expanded. Each level is
+    fetched concurrently with up to max_workers threads, and nodes reached
+    from several parents (a SNP in several loci) are fetched once and shared.
+    """
+    if kind not in LOOKUPS:
+        raise ValueError(f"cannot expand from {kind!r}, expected one of {', '.join(LOOKUPS)}")
+    chain = LEVELS[LEVELS.index(kind) + 1:]
+    if path is None:
+        path = chain if depth is None else chain[:depth]
+    elif tuple(path) != chain[:len(path)]:
+        raise ValueError(f"path must follow {' -> '.join((kind,) + chain)}")
+    workers = max_workers or api.max_workers
+
+    root = Node(kind, str(id_), getattr(api, LOOKUPS[kind])(id_))
+    graph = Graph(root)
+    level = [root]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for child_kind in path:
+            children = CHILDREN[child_kind]
+            found = executor.map(lambda parent: list(children(api, parent)), level)
+            next_level = []
+            for parent, pairs in zip(level, found):
+                for child_id, data in pairs:
+                    node = graph.nodes.get((child_kind, child_id))
+                    if node is None:
+                        node = graph.nodes[(child_kind, child_id)] = Node(child_kind, child_id, data)
+                        next_level.append(node)
+                    node.parents.append(parent)
+                    parent.children.append(node)
+            missing = [node for node in next_level if node.data is None]
+            if missing:
+                lookup = getattr(api, LOOKUPS[child_kind])
+                for node, data in zip(missing, executor.map(lambda node: lookup(node.id), missing)):
+                    node.data = data
+            level = next_level
+    return graph
@@ -1,583 +1,471 @@
-import requests
-
+import json
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import copy_context
+from urllib.parse import urlsplit
+
+from .cache import CacheEntry, cache_key
+from .columnar import ASSOCIATION_COLUMNS, SNP_COLUMNS, materialize
+from .decoding import PageStream, get_decoder
+from .endpoints import endpoint_methods
+from .http import BulkResult, HTTPClient, bulk_map
+from .metrics import endpoint_of, take_connect_time
+from .resilience import RetryPolicy
+
+BASE_URL = "https://www.ebi.ac.uk/gwas/rest/api/v2"
+
+
+def page_records(page):
+    """
+    Return the list of records embedded in a HAL page.
+    List endpoints wrap their records as {"_embedded": {"<name>": [...]}}.
+    """
+    for value in (page.get("_embedded") or {}).values():
+        if isinstance(value, list):
+            return value
+    return []
+
+
+def next_page_number(page):
+    """
+    Return the number of the page following a HAL page, or None if it is the last.
+    """
+    info = page.get("page")
+    if info is None:
+        return None
+    number = info.get("number", 0) + 1
+    if number >= info.get("totalPages", 0):
+        return None
+    return number
+
+
+def _timing_adapter(**options):
+    # gwascat.adapters imports requests, so it is loaded with the session
+    from .adapters import TimingAdapter
+    return TimingAdapter(**options)
+
+
+def _http_attribute(name):
+    # request settings live on the HTTPClient and stay settable on the client
+    return property(lambda self: getattr(self.http, name), lambda self, value: setattr(self.http, name, value))
+
+
+@endpoint_methods()
 class Gwasapi:
-    def __init__(self):
-        pass
-
-    def get_metadata(self):
-        """
-        Fetch metadata from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/metadata"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_studies(
-        self,
-        pubmed_id=None,
-        disease_trait=None,
-        full_pvalue_set=None,
-        efo_id=None,
-        efo_trait=None,
-        accession_id=None,
-        cohort=None,
-        gxe=None,
-        ancestral_group=None,
-        no_of_individuals=None,
-        show_child_trait=None,
-        mapped_gene=None,
-        extended_geneset=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch studies from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/studies"
-        headers = {"accept": "application/json"}
-        params = {}
-        if pubmed_id is not None:
-            params["pubmedId"] = pubmed_id
-        if disease_trait is not None:
-            params["diseaseTrait"] = disease_trait
-        if full_pvalue_set is not None:
-            params["fullPvalueSet"] = full_pvalue_set
-        if efo_id is not None:
-            params["efoId"] = efo_id
-        if efo_trait is not None:
-            params["efoTrait"] = efo_trait
-        if accession_id is not None:
-            params["accessionId"] = accession_id
-        if cohort is not None:
-            params["cohort"] = cohort
-        if gxe is not None:
-            params["gxe"] = gxe
-        if ancestral_group is not None:
-            params["ancestralGroup"] = ancestral_group
-        if no_of_individuals is not None:
-            params["noOfIndividuals"] = no_of_individuals
-        if show_child_trait is not None:
-            params["showChildTrait"] = show_child_trait
-        if mapped_gene is not None:
-            params["mappedGene"] = mapped_gene
-        if extended_geneset is not None:
-            params["extendedGeneset"] = extended_geneset
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_study(self, accession_id):
-        """
-        Fetch a single study from the GWAS Catalog API by accession ID.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/studies/{accession_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_associations(
-        self,
-        pubmed_id=None,
-        rs_id=None,
-        full_pvalue_set=None,
-        accession_id=None,
-        efo_trait=None,
-        efo_id=None,
-        show_child_trait=None,
-        mapped_gene=None,
-        extended_geneset=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch associations from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/associations"
-        headers = {"accept": "application/json"}
-        params = {}
-        if pubmed_id is not None:
-            params["pubmedId"] = pubmed_id
-        if rs_id is not None:
-            params["rsId"] = rs_id
-        if full_pvalue_set is not None:
-            params["fullPvalueSet"] = full_pvalue_set
-        if accession_id is not None:
-            params["accessionId"] = accession_id
-        if efo_trait is not None:
-            params["efoTrait"] = efo_trait
-        if efo_id is not None:
-            params["efoId"] = efo_id
-        if show_child_trait is not None:
-            params["showChildTrait"] = show_child_trait
-        if mapped_gene is not None:
-            params["mappedGene"] = mapped_gene
-        if extended_geneset is not None:
-            params["extendedGeneset"] = extended_geneset
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_association(self, association_id):
-        """
-        Fetch a single association from the GWAS Catalog API by association ID.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/associations/{association_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_publications(
-        self,
-        pubmed_id=None,
-        title=None,
-        first_author=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch publications from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/publications"
-        headers = {"accept": "application/json"}
-        params = {}
-        if pubmed_id is not None:
-            params["pubmedId"] = pubmed_id
-        if title is not None:
-            params["title"] = title
-        if first_author is not None:
-            params["firstAuthor"] = first_author
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_publication(self, pubmed_id):
-        """
-        Fetch a single publication from the GWAS Catalog API by pubmed_id.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/publications/{pubmed_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_efo_traits(
-        self,
-        efo_trait=None,
-        uri=None,
-        efo_id=None,
-        pubmed_id=None,
-        mapped_gene=None,
-        extended_geneset=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch EFO traits from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/efo-traits"
-        headers = {"accept": "application/json"}
-        params = {}
-        if efo_trait is not None:
-            params["efoTrait"] = efo_trait
-        if uri is not None:
-            params["uri"] = uri
-        if efo_id is not None:
-            params["efoId"] = efo_id
-        if pubmed_id is not None:
-            params["pubmedId"] = pubmed_id
-        if mapped_gene is not None:
-            params["mappedGene"] = mapped_gene
-        if extended_geneset is not None:
-            params["extendedGeneset"] = extended_geneset
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_efo_trait(self, efo_id):
-        """
-        Fetch a single EFO trait from the GWAS Catalog API by efo_id.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/efo-traits/{efo_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_snps(
-        self,
-        rs_id=None,
-        bp_location=None,
-        bp_start=None,
-        bp_end=None,
-        pubmed_id=None,
-        chromosome=None,
-        mapped_gene=None,
-        extended_geneset=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch SNPs from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/single-nucleotide-polymorphisms"
-        headers = {"accept": "application/json"}
-        params = {}
-        if rs_id is not None:
-            params["rsId"] = rs_id
-        if bp_location is not None:
-            params["bpLocation"] = bp_location
-        if bp_start is not None:
-            params["bpStart"] = bp_start
-        if bp_end is not None:
-            params["bpEnd"] = bp_end
-        if pubmed_id is not None:
-            params["pubmedId"] = pubmed_id
-        if chromosome is not None:
-            params["chromosome"] = chromosome
-        if mapped_gene is not None:
-            params["mappedGene"] = mapped_gene
-        if extended_geneset is not None:
-            params["extendedGeneset"] = extended_geneset
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_snp(self, rs_id):
-        """
-        Fetch a single SNP from the GWAS Catalog API by rs_id.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/single-nucleotide-polymorphisms/{rs_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_genomic_contexts(
-        self,
-        rs_id,
-        sort=None,
-        direction=None
-    ):
-        """
-        Fetch all genomic contexts for a SNP from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/single-nucleotide-polymorphisms/{rs_id}/genomic-contexts"
-        headers = {"accept": "application/json"}
-        params = {}
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
+    timeout = _http_attribute("timeout")
+    rate_limiter = _http_attribute("rate_limiter")
+    retry = _http_attribute("retry")
+    circuit_breaker = _http_attribute("circuit_breaker")
 
-    def get_genomic_context(self, rs_id, genomic_context_id):
-        """
-        Fetch a single genomic context for a SNP from the GWAS Catalog API by rs_id and genomicContext_id.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/single-nucleotide-polymorphisms/{rs_id}/genomic-contexts/{genomic_context_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_genes(
+    def __init__(
         self,
-        page=None,
-        size=None,
-        sort=None
+        base_url=BASE_URL,
+        pool_size=10,
+        timeout=(5, 30),
+        max_workers=None,
+        cache=None,
+        metadata_ttl=3600,
+        memo=None,
+        decoder=None,
+        rate_limiter=None,
+        retry=RetryPolicy(),
+        circuit_breaker=None,
+        hooks=(),
+        tracer=None,
+        session=None,
+        transport=None
     ):
         """
-        Fetch genes from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/genes"
-        headers = {"accept": "application/json"}
-        params = {}
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-        if sort is not None:
-            params["sort"] = sort
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_gene(self, gene_name):
-        """
-        Fetch a single gene from the GWAS Catalog API by gene_name.
-        Returns the JSON response as a Python dict.
-        Raises HTTPError if not found or on error.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/genes/{gene_name}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_loci(self, association_id):
-        """
-        Fetch all loci for an association from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/associations/{association_id}/loci"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_locus(self, association_id, locus_id):
-        """
-        Fetch a single locus for an association from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/associations/{association_id}/loci/{locus_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_body_of_works(
-        self,
-        title=None,
-        first_author=None,
-        page=None,
-        size=None,
-        sort=None
-    ):
-        """
-        Fetch all body of works from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/body-of-works"
-        headers = {"accept": "application/json"}
-        params = {}
-        if title is not None:
-            params["title"] = title
-        if first_author is not None:
-            params["firstAuthor"] = first_author
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-        if sort is not None:
-            params["sort"] = sort
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_body_of_work(self, bow_id):
-        """
-        Fetch a single body of work from the GWAS Catalog API by bow_id.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/body-of-works/{bow_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_unpublished_studies_for_body_of_work(
-        self,
-        bow_id,
-        page=None,
-        size=None,
-        sort=None
-    ):
-        """
-        Fetch all unpublished studies for a body of work from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/body-of-works/{bow_id}/unpublished-studies"
-        headers = {"accept": "application/json"}
-        params = {}
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-        if sort is not None:
-            params["sort"] = sort
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_unpublished_studies(
-        self,
-        disease_trait=None,
-        accession_id=None,
-        title=None,
-        first_author=None,
-        cohort=None,
-        sort=None,
-        direction=None,
-        page=None,
-        size=None
-    ):
-        """
-        Fetch all unpublished studies from the GWAS Catalog API.
-        Only parameters with non-None values are sent as query parameters.
-        Returns the JSON response as a Python dict.
-        """
-        url = "https://www.ebi.ac.uk/gwas/rest/api/v2/unpublished-studies"
-        headers = {"accept": "application/json"}
-        params = {}
-        if disease_trait is not None:
-            params["diseaseTrait"] = disease_trait
-        if accession_id is not None:
-            params["accessionId"] = accession_id
-        if title is not None:
-            params["title"] = title
-        if first_author is not None:
-            params["firstAuthor"] = first_author
-        if cohort is not None:
-            params["cohort"] = cohort
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-        if page is not None:
-            params["page"] = page
-        if size is not None:
-            params["size"] = size
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_unpublished_study(self, accession_id):
-        """
-        Fetch a single unpublished study from the GWAS Catalog API by accession_id.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/unpublished-studies/{accession_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_unpublished_ancestries(
-        self,
-        accession_id,
-        sort=None,
-        direction=None
-    ):
-        """
-        Fetch all unpublished ancestries for an unpublished study from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/unpublished-studies/{accession_id}/unpublished-ancestries"
-        headers = {"accept": "application/json"}
-        params = {}
-        if sort is not None:
-            params["sort"] = sort
-        if direction is not None:
-            params["direction"] = direction
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def get_unpublished_ancestry(self, accession_id, ancestry_id):
-        """
-        Fetch a single unpublished ancestry for an unpublished study from the GWAS Catalog API.
-        Returns the JSON response as a Python dict.
-        """
-        url = f"https://www.ebi.ac.uk/gwas/rest/api/v2/unpublished-studies/{accession_id}/unpublished-ancestries/{ancestry_id}"
-        headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-
+        Client for the GWAS Catalog REST API v2.
+
+        The endpoint methods (get_*, iter_*, get_all_* and get_*_bulk) are
+        generated from the declarations in gwascat.endpoints.ENDPOINTS.
+
+        All endpoint methods share one requests.Session, so connections to the
+        API host are kept alive and reused instead of being re-established per
+        call. pool_size bounds the number of pooled connections per host and
+        timeout is passed to every request as (connect, read) seconds.
+        max_workers bounds the threads used by the get_all_* bulk methods and
+        defaults to pool_size, so every worker can hold a pooled connection.
+
+        cache is an optional response cache (see gwascat.cache) used by every
+        GET. Fresh entries are served without a network call, stale ones are
+        revalidated with If-None-Match/If-Modified-Since. The catalog metadata
+        is cached for metadata_ttl seconds and the whole cache is cleared
+        when it reports a new release.
+
+        memo is an optional in-memory gwascat.memo.LRUCache in front of the
+        single-entity lookups (get_snp, get_gene, get_efo_trait, ...); it
+        coalesces concurrent requests for the same entity and exposes
+        hit/miss counters through memo.stats().
+
+        decoder names the JSON backend ("orjson", "ujson" or "json"); by default
+        the fastest installed one is used (see gwascat.decoding).
+
+        rate_limiter is an optional gwascat.resilience.TokenBucket, which may be
+        shared with other clients and threads. retry is a RetryPolicy for
+        transient failures (None disables retries) and circuit_breaker an
+        optional CircuitBreaker that fails fast while the API is down.
+
+        hooks are callables receiving one event dict per HTTP response, retry,
+        error, cache lookup and decode, with the endpoint and phase timings
+        (see gwascat.metrics.Metrics). tracer is an optional
+        gwascat.metrics.Tracer recording a span per logical call.
+
+        For tests, base_url can point at a local stub server, session replaces
+        the pooled session entirely and transport is a requests adapter that
+        is mounted for both http:// and https:// URLs. The session is set up
+        on the first request that reaches the network, so requests is not
+        imported by clients answering from the cache.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.max_workers = max_workers or pool_size
+        self.http = HTTPClient(
+            timeout, rate_limiter, retry, session, transport, pool_size, circuit_breaker,
+            headers={"accept": "application/json"}, adapter=_timing_adapter, observer=self._observe,
+        )
+        self.cache = cache
+        self.metadata_ttl = metadata_ttl
+        self.memo = memo
+        self.decode = get_decoder(decoder)
+        self.hooks = list(hooks)
+        self.tracer = tracer
+        self._release = None
+        self._release_checked_at = None
+        self._release_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled requests.Session, created and configured on first use.
+        """
+        return self.http.session
+
+    def close(self):
+        """
+        Close the pooled session and release its connections.
+        """
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _emit(self, event, url, **data):
+        data["event"] = event
+        data["endpoint"] = endpoint_of(urlsplit(url).path)
+        data["url"] = url
+        for hook in self.hooks:
+            hook(data)
+
+    def _span(self, name, **attributes):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    def _start_span(self, name, **attributes):
+        # generators cannot hold a span open across yields with _span, so
+        # they start one here and activate it around each request they make
+        if self.tracer is None:
+            return None
+        return self.tracer.start(name, **attributes)
+
+    def _activate(self, span):
+        if span is None:
+            return nullcontext()
+        return self.tracer.activate(span)
+
+    def _finish_span(self, span):
+        if span is not None:
+            self.tracer.finish(span)
+
+    def _fetch(self, url, params=None, headers=None, stream=False):
+        """
+        Issue a GET request on the pooled session, applying rate limit, retries and circuit breaker.
+        Returns the response, raises HTTPError on error status.
+        """
+        return self.http.get(url, params, headers, stream)
+
+    def _observe(self, event, url, **data):
+        if event == "send":
+            # drop connect time left over from a request that reported no response
+            take_connect_time()
+        elif self.hooks:
+            if event == "response":
+                self._emit_response(url, **data)
+            else:
+                self._emit(event, url, **data)
+
+    def _emit_response(self, url, response, started, attempt, stream):
+        """
+        Report one HTTP exchange to the hooks. ttfb is the time from sending
+        the request until the response headers were parsed, connection setup
+        included; transfer is the time spent reading the body afterwards.
+        Streamed bodies are read by the caller, so they report neither
+        transfer time nor size.
+        """
+        total = time.perf_counter() - started
+        ttfb = response.elapsed.total_seconds()
+        timings = {"connect": take_connect_time(), "ttfb": ttfb}
+        if not stream:
+            timings["transfer"] = max(0.0, total - ttfb)
+            timings["total"] = total
+        self._emit(
+            "response", url,
+            status=response.status_code,
+            attempt=attempt,
+            timings=timings,
+            bytes=None if stream else len(response.content),
+        )
+
+    def _get(self, url, params=None, memoize=False, stream=False):
+        """
+        Issue a GET request, going through the memo and response cache if configured.
+        Returns the decoded JSON body, raises HTTPError on error status.
+        With stream=True the cache is bypassed and a PageStream over the
+        response body is returned instead.
+        """
+        with self._span("GET " + endpoint_of(urlsplit(url).path), url=url, params=params):
+            if stream:
+                response = self._fetch(url, params, stream=True)
+                return PageStream(response.iter_content(chunk_size=65536), response.close)
+            if memoize and self.memo is not None:
+                body = self.memo.get_or_load(cache_key(url, params), lambda: self._get_body(url, params))
+            else:
+                body = self._get_body(url, params)
+            if not self.hooks:
+                return self.decode(body)
+            started = time.perf_counter()
+            result = self.decode(body)
+            self._emit("decode", url, timings={"decode": time.perf_counter() - started})
+            return result
+
+    def get_if_changed(self, path, params=None, etag=None):
+        """
+        GET a path below the base URL with If-None-Match: etag, bypassing
+        the memo and response cache. Returns (decoded JSON body, ETag), or
+        (None, etag) if the server answered 304 Not Modified.
+        """
+        url = self.base_url + path
+        headers = {"if-none-match": etag} if etag else None
+        with self._span("GET " + endpoint_of(urlsplit(url).path), url=url, params=params):
+            response = self._fetch(url, params, headers)
+        if response.status_code == 304:
+            return None, etag
+        return self.decode(response.content), response.headers.get("etag")
+
+    def _get_body(self, url, params=None):
+        if self.cache is None:
+            return self._fetch(url, params).content
+        metadata_url = f"{self.base_url}/metadata"
+        if url == metadata_url:
+            with self._release_lock:
+                return self._compare_release(metadata_url)
+        self._check_release(metadata_url)
+        return self._cached_get(url, params, self.cache.ttl)
+
+    def _cached_get(self, url, params, ttl):
+        key = cache_key(url, params)
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry is not None and now - entry.stored_at < ttl:
+            if self.hooks:
+                self._emit("cache", url, outcome="hit")
+            return entry.body
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["if-none-match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["if-modified-since"] = entry.last_modified
+        response = self._fetch(url, params, headers)
+        if response.status_code == 304 and entry is not None:
+            if self.hooks:
+                self._emit("cache", url, outcome="revalidated")
+            self.cache.set(key, entry._replace(stored_at=now))
+            return entry.body
+        if self.hooks:
+            self._emit("cache", url, outcome="miss")
+        self.cache.set(key, CacheEntry(
+            response.content,
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+            now,
+        ))
+        return response.content
+
+    def _release_fresh(self):
+        return self._release_checked_at is not None and time.time() - self._release_checked_at < self.metadata_ttl
+
+    def _check_release(self, metadata_url):
+        """
+        Clear the cache if the catalog release changed since it was filled.
+        The outcome is remembered for metadata_ttl seconds; after that the
+        cached metadata is revalidated and compared again.
+        """
+        if self._release_fresh():
+            return
+        with self._release_lock:
+            if not self._release_fresh():
+                self._compare_release(metadata_url)
+
+    def _compare_release(self, metadata_url):
+        """
+        Fetch the metadata through the cache and clear the cache if it names
+        a new release; the release is identified by the full metadata
+        document. Returns the metadata body. Called with _release_lock held.
+        """
+        body = self._cached_get(metadata_url, None, self.metadata_ttl)
+        release = json.dumps(self.decode(body), sort_keys=True)
+        if release != self._release and self.cache.get_meta("release") != release:
+            key = cache_key(metadata_url)
+            entry = self.cache.get(key)
+            self.cache.clear()
+            self.cache.set(key, entry)
+            self.cache.set_meta("release", release)
+        self._release = release
+        self._release_checked_at = time.time()
+        return body
+
+    def _iter_pages(self, fetch, params, prefetch=True, model=None):
+        """
+        Yield records from every page of a list endpoint, starting at params["page"].
+        fetch is the bound get_* method; the next page is located from the
+        page metadata, or from _links.next for responses without it.
+        With prefetch, the next page is requested in a background thread
+        while the caller consumes the current one. With params["stream"],
+        each page is parsed incrementally as it downloads instead; the next
+        page is then requested once the current one has been read.
+        model is an optional gwascat.models record class: pages are then
+        streamed and each record is built from its undecoded JSON text,
+        decoded on first access with the client's decoder.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if model is not None:
+            params = dict(params, stream=True)
+        stream = params.get("stream", False)
+        span = self._start_span("iter " + fetch.__name__, params=params)
+
+        def fetch_next(page):
+            with self._activate(span):
+                number = next_page_number(page)
+                if number is not None:
+                    return fetch(**dict(params, page=number))
+                if page.get("page") is None:
+                    href = page.get("_links", {}).get("next", {}).get("href")
+                    if href:
+                        return self._get(href, stream=stream)
+                return None
+
+        executor = None
+        try:
+            with self._activate(span):
+                page = fetch(**params)
+            if stream:
+                while page is not None:
+                    if model is None:
+                        yield from page
+                    else:
+                        page.raw = True
+                        yield from (model(text, self.decode) for text in page)
+                    page = fetch_next(page.members)
+                return
+            if not prefetch:
+                while page is not None:
+                    yield from page_records(page)
+                    page = fetch_next(page)
+                return
+
+            executor = ThreadPoolExecutor(max_workers=1)
+            while page is not None:
+                pending = executor.submit(fetch_next, page)
+                yield from page_records(page)
+                page = pending.result()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._finish_span(span)
+
+    def get_associations_columnar(self, format="numpy", **params):
+        """
+        Fetch all associations matching the get_associations parameters as typed columns.
+        Pages are flattened as they arrive (see gwascat.columnar); format is
+        "numpy", "arrow" or "pandas".
+        """
+        return materialize(self.iter_associations(**params), ASSOCIATION_COLUMNS, format)
+
+    def get_snps_columnar(self, format="numpy", **params):
+        """
+        Fetch all SNPs matching the get_snps parameters as typed columns.
+        Pages are flattened as they arrive (see gwascat.columnar); format is
+        "numpy", "arrow" or "pandas".
+        """
+        return materialize(self.iter_snps(**params), SNP_COLUMNS, format)
+
+    def expand(self, kind, id_, depth=None, path=None, max_workers=None):
+        """
+        Fetch a root entity ("study", "association" or "snp") and its related records
+        as one linked gwascat.graph.Graph, level by level and concurrently.
+        See gwascat.graph.expand for the depth and path arguments.
+        """
+        from .graph import expand
+        return expand(self, kind, id_, depth, path, max_workers)
+
+    def export(self, entity, path, format="ndjson", page_size=200, row_group_size=10000,
+               compression=None, max_workers=None, progress=None, **params):
+        """
+        Export every record of a list query ("associations", "snps", ...) to an
+        NDJSON file or a Parquet dataset directory, with pages fetched, encoded
+        and written concurrently in bounded memory. An interrupted export
+        resumes from the last written batch; see gwascat.export.Exporter.
+        """
+        from .export import export
+        return export(
+            self, entity, path, format, page_size, row_group_size,
+            compression, max_workers, progress, **params
+        )
+
+    def _fetch_all(self, fetch, params, max_workers=None):
+        """
+        Fetch every page of a list endpoint and return the merged records in page order.
+        The first page is fetched to learn the page count; the remaining pages
+        are independent and are fetched concurrently by at most max_workers threads.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._span("get_all " + fetch.__name__, params=params):
+            first = fetch(**params)
+            records = list(page_records(first))
+            info = first.get("page")
+            if info is None:
+                return records
+            start = info.get("number", 0) + 1
+            numbers = range(start, info.get("totalPages", 0))
+            if not numbers:
+                return records
+            workers = min(max_workers or self.max_workers, len(numbers))
+            # each worker request runs in a copy of this context, so it is traced as a child span
+            tasks = [(copy_context(), number) for number in numbers]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages = executor.map(lambda task: task[0].run(fetch, **dict(params, page=task[1])), tasks)
+                for page in pages:
+                    records.extend(page_records(page))
+            return records
+
+    def _bulk(self, lookup, ids, max_workers=None):
+        """
+        Look up every distinct ID with lookup() on a bounded thread pool; see
+        gwascat.http.bulk_map. Every lookup runs in a copy of the context of
+        the bulk span, so it is traced as a child span.
+        """
+        span = self._start_span("bulk " + getattr(lookup, "__name__", "lookup"))
+        with self._activate(span):
+            context = copy_context()
+        try:
+            yield from bulk_map(lambda id_: context.copy().run(lookup, id_), ids, max_workers or self.max_workers)
+        finally:
+            self._finish_span(span)
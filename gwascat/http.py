@@ -0,0 +1,187 @@
+"""
+HTTP plumbing shared by Gwasapi and the expatlas and pmcapi clients: a
+requests session created on first use with a retrying GET, and a bounded
+concurrent map yielding BulkResult tuples.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from .resilience import RetryPolicy
+
+BulkResult = namedtuple("BulkResult", ["id", "value", "error"])
+
+
+class HTTPClient:
+    def __init__(self, timeout=(5, 60), rate_limiter=None, retry=RetryPolicy(), session=None, transport=None,
+                 pool_size=10, circuit_breaker=None, headers=None, adapter=None, observer=None):
+        """
+        Pooled requests session with a GET applying rate limit, retries and circuit breaker.
+
+        The session is set up on the first request, so requests is not
+        imported by clients answering from their cache. adapter is called
+        with pool_connections and pool_maxsize set to pool_size to create
+        the pooled transport (default requests.adapters.HTTPAdapter), and
+        headers are added to the session's defaults. rate_limiter is an
+        optional gwascat.resilience.TokenBucket, retry a RetryPolicy (None
+        disables retries) and circuit_breaker an optional CircuitBreaker.
+        For tests, session replaces the pooled session entirely and
+        transport is a requests adapter mounted for both http:// and
+        https:// URLs.
+
+        observer, if given, is called as observer(event, url, **data) before
+        every attempt ("send"), on a connection error ("error": reason,
+        attempt), for every response ("response": response, started,
+        attempt, stream) and before a retry ("retry": reason, attempt).
+        """
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.transport = transport
+        self.pool_size = pool_size
+        self.headers = dict(headers or {})
+        self.adapter = adapter
+        self.observer = observer
+        self._session = session
+        self._session_ready = False
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled requests.Session, created and configured on first use.
+        """
+        if not self._session_ready:
+            with self._session_lock:
+                if not self._session_ready:
+                    self._session = self._setup_session(self._session, self.transport)
+                    self._session_ready = True
+        return self._session
+
+    def _setup_session(self, session, transport):
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            if transport is None:
+                adapter = self.adapter
+                if adapter is None:
+                    from requests.adapters import HTTPAdapter as adapter
+                transport = adapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        if transport is not None:
+            session.mount("https://", transport)
+            session.mount("http://", transport)
+        session.headers.update(self.headers)
+        session.headers.update({"accept-encoding": "gzip, deflate", "connection": "keep-alive"})
+        return session
+
+    def close(self):
+        """
+        Close the pooled session and release its connections.
+        """
+        if self._session_ready:
+            self._session.close()
+
+    def _observe(self, event, url, **data):
+        if self.observer is not None:
+            self.observer(event, url, **data)
+
+    def _record_outcome(self, success):
+        """
+        Report a request to the circuit breaker; success is None for a
+        request that was interrupted before it had an outcome.
+        """
+        if self.circuit_breaker is None:
+            return
+        if success is None:
+            self.circuit_breaker.release_trial()
+        elif success:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+
+    def get(self, url, params=None, headers=None, stream=False, rate_limiter=None, allow=()):
+        """
+        Issue a GET request, applying rate limit, retries and circuit breaker.
+        rate_limiter replaces the client's one for this request. Returns the
+        response; statuses in allow are returned as they are, other error
+        statuses raise HTTPError.
+        """
+        import requests
+
+        session = self.session
+        limiter = rate_limiter or self.rate_limiter
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            if limiter is not None:
+                limiter.acquire()
+            self._observe("send", url)
+            started = time.perf_counter()
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                self._record_outcome(False)
+                self._observe("error", url, reason=type(exc).__name__, attempt=attempt)
+                if self.retry is None or not self.retry.should_retry(attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except BaseException as exc:
+                # every request, a circuit breaker trial in particular, must record an outcome
+                self._record_outcome(False if isinstance(exc, Exception) else None)
+                raise
+            self._observe("response", url, response=response, started=started, attempt=attempt, stream=stream)
+            transient = response.status_code == 429 or response.status_code >= 500
+            self._record_outcome(not transient)
+            if self.retry is not None and self.retry.should_retry(attempt, response.status_code):
+                response.close()
+                self._observe("retry", url, reason=str(response.status_code), attempt=attempt)
+                time.sleep(self.retry.delay(attempt, response.headers.get("retry-after")))
+                attempt += 1
+                continue
+            if response.status_code not in allow:
+                response.raise_for_status()
+            return response
+
+
+def bulk_map(function, ids, max_workers):
+    """
+    Call function(id) for every distinct ID on a pool of max_workers threads.
+    Yields a BulkResult(id, value, error) per ID as soon as it completes; a
+    failed call sets error to the exception instead of raising. At most
+    twice max_workers calls are queued at any time, so ids may be an
+    arbitrarily long iterator.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    seen = set()
+    pending = {}
+
+    def result(future):
+        id_ = pending.pop(future)
+        error = future.exception()
+        if error is not None:
+            return BulkResult(id_, None, error)
+        return BulkResult(id_, future.result(), None)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for id_ in ids:
+            if id_ in seen:
+                continue
+            seen.add(id_)
+            pending[executor.submit(function, id_)] = id_
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield result(future)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield result(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
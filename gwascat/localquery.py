@@ -0,0 +1,377 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from .columnar import field_value, first_location, rs_id_of
+
+
+def _values(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _key(value):
+    return str(value).casefold()
+
+
+def _nested(record, list_fields, item_fields):
+    """
+    Return the item_fields values of every element in a list field,
+    accepting both dict elements and plain strings.
+    """
+    result = []
+    for item in _values(field_value(record, *list_fields)):
+        if isinstance(item, dict):
+            item = field_value(item, *item_fields)
+        if item is not None:
+            result.append(item)
+    return result
+
+
+def _genes(record):
+    return _nested(record, ("mapped_genes", "mappedGenes"), ("gene_name", "geneName"))
+
+
+def _efo_ids(record):
+    return _nested(record, ("efo_traits", "efoTraits"), ("efo_id", "efoId")) + _values(
+        field_value(record, "efo_id", "efoId")
+    )
+
+
+def _efo_traits(record):
+    return _nested(record, ("efo_traits", "efoTraits"), ("efo_trait", "efoTrait")) + _values(
+        field_value(record, "efo_trait", "efoTrait")
+    )
+
+
+def _field(*names):
+    return lambda record: _values(field_value(record, *names))
+
+
+# keyword argument -> extractor returning the record's values for hash indexes
+SNP_INDEXES = {
+    "rs_id": lambda record: _values(rs_id_of(record)),
+    "mapped_gene": _genes,
+    "pubmed_id": _field("pubmed_id", "pubmedId"),
+}
+ASSOCIATION_INDEXES = {
+    "association_id": _field("association_id", "associationId"),
+    "rs_id": lambda record: _values(rs_id_of(record)),
+    "accession_id": _field("accession_id", "accessionId"),
+    "pubmed_id": _field("pubmed_id", "pubmedId"),
+    "efo_id": _efo_ids,
+    "efo_trait": _efo_traits,
+    "mapped_gene": _genes,
+}
+STUDY_INDEXES = {
+    "accession_id": _field("accession_id", "accessionId"),
+    "pubmed_id": _field("pubmed_id", "pubmedId"),
+    "efo_id": _efo_ids,
+    "efo_trait": _efo_traits,
+    "mapped_gene": _genes,
+    "disease_trait": _field("disease_trait", "diseaseTrait", "reported_trait", "reportedTrait"),
+    "cohort": _field("cohort"),
+}
+
+
+class Table:
+    def __init__(self, name, records, indexes, intervals=False):
+        """
+        In-memory records of one entity with hash indexes and an optional
+        per-chromosome position index.
+
+        Hash indexes map the casefolded value of each indexed keyword to the
+        sorted record positions holding it. The interval index keeps, per
+        chromosome, the record positions sorted by base-pair location so
+        range queries are two bisections. Sorted pages use a per-field
+        ordering of all records, built on the first query sorting by it.
+        """
+        self.name = name
+        self.records = list(records)
+        self.indexes = {keyword: defaultdict(list) for keyword in indexes}
+        for position, record in enumerate(self.records):
+            for keyword, extract in indexes.items():
+                for value in set(_key(v) for v in extract(record)):
+                    self.indexes[keyword][value].append(position)
+        self.chromosomes = {}
+        self._ranks = {}
+        self._orders = {}
+        if intervals:
+            located = defaultdict(list)
+            for position, record in enumerate(self.records):
+                chromosome, location = first_location(record)
+                if chromosome is None or location is None:
+                    continue
+                try:
+                    location = int(location)
+                except (TypeError, ValueError):
+                    continue
+                located[_key(chromosome)].append((location, position))
+            for chromosome, pairs in located.items():
+                pairs.sort()
+                self.chromosomes[chromosome] = (
+                    array("q", (location for location, _ in pairs)),
+                    array("q", (position for _, position in pairs)),
+                )
+
+    def lookup(self, keyword, value):
+        """
+        Return the sorted positions of records whose keyword index holds value.
+        """
+        return self.indexes[keyword].get(_key(value), [])
+
+    def in_range(self, chromosome, start=None, end=None):
+        """
+        Return record positions on a chromosome with start <= location <= end.
+        """
+        locations, positions = self.chromosomes.get(_key(chromosome), (array("q"), array("q")))
+        lo = 0 if start is None else bisect_left(locations, int(start))
+        hi = len(locations) if end is None else bisect_right(locations, int(end))
+        return positions[lo:hi]
+
+    def query(self, filters, chromosome=None, bp_start=None, bp_end=None):
+        """
+        Return the record positions matching all filters, in storage order.
+        filters maps indexed keywords to values; chromosome and the bp bounds
+        use the interval index. bp bounds without a chromosome select the
+        range on every chromosome.
+        """
+        candidates = None
+        if chromosome is not None:
+            candidates = sorted(self.in_range(chromosome, bp_start, bp_end))
+        elif bp_start is not None or bp_end is not None:
+            candidates = sorted(
+                position for name in self.chromosomes for position in self.in_range(name, bp_start, bp_end)
+            )
+        for keyword, value in sorted(filters.items(), key=lambda item: len(self.lookup(*item))):
+            matches = self.lookup(keyword, value)
+            if candidates is None:
+                candidates = matches
+            else:
+                keep = set(matches)
+                candidates = [position for position in candidates if position in keep]
+            if not candidates:
+                break
+        if candidates is None:
+            return range(len(self.records))
+        return candidates
+
+    def _rank(self, sort):
+        """
+        Return, per record position, the rank of its sort field value among
+        all records; equal values share a rank and missing ones rank last.
+        """
+        rank = self._ranks.get(sort)
+        if rank is None:
+            keys = [(record.get(sort) is None, record.get(sort)) for record in self.records]
+            rank = array("q", bytes(8 * len(keys)))
+            current, previous = -1, None
+            for number, position in enumerate(sorted(range(len(keys)), key=keys.__getitem__)):
+                if number == 0 or keys[position] != previous:
+                    current, previous = current + 1, keys[position]
+                rank[position] = current
+            self._ranks[sort] = rank
+        return rank
+
+    def _sorted(self, positions, sort, descending):
+        rank = self._rank(sort)
+        if isinstance(positions, range) and len(positions) == len(self.records):
+            # every record matches: the cached ordering of the whole table is the answer
+            order = self._orders.get((sort, descending))
+            if order is None:
+                order = self._orders[(sort, descending)] = array(
+                    "q", sorted(positions, key=rank.__getitem__, reverse=descending)
+                )
+            return order
+        return sorted(positions, key=rank.__getitem__, reverse=descending)
+
+    def page(self, positions, sort=None, direction=None, page=None, size=None):
+        """
+        Build a HAL-shaped page from matching positions, mirroring the API's paging.
+        Only the records of the requested page are looked up; sorting
+        orders the positions by precomputed ranks of the sort field.
+        """
+        page = page or 0
+        size = size or 20
+        if sort is not None:
+            positions = self._sorted(positions, sort, (direction or "asc").lower() == "desc")
+        total = len(positions)
+        return {
+            "_embedded": {self.name: [self.records[position] for position in positions[page * size:(page + 1) * size]]},
+            "page": {
+                "size": size,
+                "totalElements": total,
+                "totalPages": (total + size - 1) // size,
+                "number": page,
+            },
+        }
+
+
+class LocalGwasapi:
+    def __init__(self, mirror):
+        """
+        Query engine over a gwascat.mirror.Mirror answering the get_snps,
+        get_associations and get_studies parameters without network access.
+
+        All records are loaded and indexed once at construction: hash indexes
+        on rsId, accession, PubMed ID, EFO ID/trait and mapped gene, and a
+        per-chromosome sorted index on base-pair location for SNPs and
+        associations. Filters needing the catalog's ontology or gene sets
+        (show_child_trait, extended_geneset) are matched exactly.
+        """
+        self.release = mirror.release
+        self.snps = Table("snps", mirror.records("snps"), SNP_INDEXES, intervals=True)
+        self.associations = Table("associations", mirror.records("associations"), ASSOCIATION_INDEXES, intervals=True)
+        self.studies = Table("studies", mirror.records("studies"), STUDY_INDEXES)
+
+    def get_metadata(self):
+        return self.release
+
+    def get_snps(
+        self,
+        rs_id=None,
+        bp_location=None,
+        bp_start=None,
+        bp_end=None,
+        pubmed_id=None,
+        chromosome=None,
+        mapped_gene=None,
+        extended_geneset=None,
+        sort=None,
+        direction=None,
+        page=None,
+        size=None
+    ):
+        """
+        Query mirrored SNPs with the get_snps parameters.
+        Returns a HAL-shaped page dict like the API.
+        """
+        if bp_location is not None:
+            bp_start = bp_end = bp_location
+        filters = {"rs_id": rs_id, "pubmed_id": pubmed_id, "mapped_gene": mapped_gene}
+        filters = {keyword: value for keyword, value in filters.items() if value is not None}
+        positions = self.snps.query(filters, chromosome, bp_start, bp_end)
+        return self.snps.page(positions, sort, direction, page, size)
+
+    def get_snp(self, rs_id):
+        """
+        Return a single mirrored SNP by rs_id, raising KeyError if it is not mirrored.
+        """
+        positions = self.snps.lookup("rs_id", rs_id)
+        if not positions:
+            raise KeyError(rs_id)
+        return self.snps.records[positions[0]]
+
+    def get_associations(
+        self,
+        pubmed_id=None,
+        rs_id=None,
+        full_pvalue_set=None,
+        accession_id=None,
+        efo_trait=None,
+        efo_id=None,
+        show_child_trait=None,
+        mapped_gene=None,
+        extended_geneset=None,
+        sort=None,
+        direction=None,
+        page=None,
+        size=None
+    ):
+        """
+        Query mirrored associations with the get_associations parameters.
+        Returns a HAL-shaped page dict like the API.
+        """
+        filters = {
+            "pubmed_id": pubmed_id,
+            "rs_id": rs_id,
+            "accession_id": accession_id,
+            "efo_trait": efo_trait,
+            "efo_id": efo_id,
+            "mapped_gene": mapped_gene,
+        }
+        filters = {keyword: value for keyword, value in filters.items() if value is not None}
+        positions = self.associations.query(filters)
+        if full_pvalue_set is not None:
+            positions = self._where(self.associations, positions, ("full_pvalue_set", "fullPvalueSet"), full_pvalue_set)
+        return self.associations.page(positions, sort, direction, page, size)
+
+    def get_association(self, association_id):
+        """
+        Return a single mirrored association, raising KeyError if it is not mirrored.
+        """
+        positions = self.associations.lookup("association_id", association_id)
+        if not positions:
+            raise KeyError(association_id)
+        return self.associations.records[positions[0]]
+
+    def get_associations_in_region(self, chromosome, bp_start=None, bp_end=None, page=None, size=None):
+        """
+        Return mirrored associations located on chromosome between bp_start and bp_end.
+        """
+        positions = self.associations.query({}, chromosome, bp_start, bp_end)
+        return self.associations.page(positions, page=page, size=size)
+
+    def get_studies(
+        self,
+        pubmed_id=None,
+        disease_trait=None,
+        full_pvalue_set=None,
+        efo_id=None,
+        efo_trait=None,
+        accession_id=None,
+        cohort=None,
+        gxe=None,
+        ancestral_group=None,
+        no_of_individuals=None,
+        show_child_trait=None,
+        mapped_gene=None,
+        extended_geneset=None,
+        sort=None,
+        direction=None,
+        page=None,
+        size=None
+    ):
+        """
+        Query mirrored studies with the get_studies parameters.
+        Returns a HAL-shaped page dict like the API.
+        """
+        filters = {
+            "pubmed_id": pubmed_id,
+            "disease_trait": disease_trait,
+            "efo_id": efo_id,
+            "efo_trait": efo_trait,
+            "accession_id": accession_id,
+            "cohort": cohort,
+            "mapped_gene": mapped_gene,
+        }
+        filters = {keyword: value for keyword, value in filters.items() if value is not None}
+        positions = self.studies.query(filters)
+        for fields, value in (
+            (("full_pvalue_set", "fullPvalueSet"), full_pvalue_set),
+            (("gxe",), gxe),
+            (("ancestral_group", "ancestralGroup"), ancestral_group),
+            (("no_of_individuals", "noOfIndividuals", "initial_sample_size"), no_of_individuals),
+        ):
+            if value is not None:
+                positions = self._where(self.studies, positions, fields, value)
+        return self.studies.page(positions, sort, direction, page, size)
+
+    def get_study(self, accession_id):
+        """
+        Return a single mirrored study, raising KeyError if it is not mirrored.
+        """
+        positions = self.studies.lookup("accession_id", accession_id)
+        if not positions:
+            raise KeyError(accession_id)
+        return self.studies.records[positions[0]]
+
+    def _where(self, table, positions, fields, value):
+        wanted = _key(value)
+        return [
+            position for position in positions
+            if any(_key(v) == wanted for v in _values(field_value(table.records[position], *fields)))
+        ]
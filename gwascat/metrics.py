@@ -0,0 +1,250 @@
+import contextvars
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+COLLECTIONS = frozenset({
+    "metadata", "studies", "associations", "publications", "efo-traits",
+    "single-nucleotide-polymorphisms", "genomic-contexts", "genes", "loci",
+    "body-of-works", "unpublished-studies", "unpublished-ancestries",
+})
+
+_connect_time = threading.local()
+
+
+def endpoint_of(path):
+    """
+    Return the endpoint label of a request path: collection names are kept
+    and entity IDs replaced by {id}, e.g. /single-nucleotide-polymorphisms/{id}.
+    """
+    segments = [segment for segment in path.split("?")[0].split("/") if segment]
+    while segments and segments[0] not in COLLECTIONS:
+        segments.pop(0)
+    return "/" + "/".join(s if s in COLLECTIONS else "{id}" for s in segments)
+
+
+def add_connect_time(seconds):
+    """
+    Count time the current thread spent opening a connection.
+    """
+    _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + seconds
+
+
+def take_connect_time():
+    """
+    Return and reset the time the current thread spent opening connections.
+    """
+    seconds = getattr(_connect_time, "seconds", 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+def __getattr__(name):
+    # TimingAdapter lives in gwascat.adapters, so hooks and tracing do not import requests
+    if name == "TimingAdapter":
+        from .adapters import TimingAdapter
+        return TimingAdapter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        return list(itertools.accumulate(self.counts))
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.buckets + (float("inf"),), self.cumulative()):
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Request metrics collected from Gwasapi request events.
+
+        Pass an instance as Gwasapi(hooks=[metrics]). It keeps per-endpoint
+        latency histograms for the connect/ttfb/transfer/decode/total phases,
+        payload size histograms and counters for status codes, retries,
+        errors and cache outcomes, exportable with to_prometheus() or
+        snapshot().
+        """
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        endpoint = event["endpoint"]
+        kind = event["event"]
+        with self._lock:
+            for phase, seconds in event.get("timings", {}).items():
+                self.latency[(endpoint, phase)].observe(seconds)
+            if kind == "response":
+                self.counters[("responses", endpoint, str(event["status"]))] += 1
+                if event.get("bytes") is not None:
+                    self.sizes[endpoint].observe(event["bytes"])
+            elif kind == "cache":
+                self.counters[("cache", endpoint, event["outcome"])] += 1
+            elif kind in ("retry", "error"):
+                self.counters[(kind, endpoint, event.get("reason", ""))] += 1
+
+    def snapshot(self):
+        """
+        Return all metrics as a JSON-serializable dict.
+        """
+        with self._lock:
+            latency = {}
+            for (endpoint, phase), histogram in sorted(self.latency.items()):
+                latency.setdefault(endpoint, {})[phase] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                }
+            sizes = {
+                endpoint: {"count": histogram.count, "sum": histogram.sum}
+                for endpoint, histogram in sorted(self.sizes.items())
+            }
+            counters = defaultdict(dict)
+            for (name, endpoint, label), value in sorted(self.counters.items()):
+                counters[name].setdefault(endpoint, {})[label] = value
+        return {"latency_seconds": latency, "payload_bytes": sizes, "counters": dict(counters)}
+
+    def to_prometheus(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            lines.append("# HELP gwascat_request_seconds GWAS Catalog request phase durations.")
+            lines.append("# TYPE gwascat_request_seconds histogram")
+            for (endpoint, phase), histogram in sorted(self.latency.items()):
+                self._histogram_lines(lines, "gwascat_request_seconds", histogram, endpoint=endpoint, phase=phase)
+            lines.append("# HELP gwascat_response_bytes GWAS Catalog response payload sizes.")
+            lines.append("# TYPE gwascat_response_bytes histogram")
+            for endpoint, histogram in sorted(self.sizes.items()):
+                self._histogram_lines(lines, "gwascat_response_bytes", histogram, endpoint=endpoint)
+            label_names = {"responses": "status", "cache": "outcome", "retry": "reason", "error": "reason"}
+            for name in ("responses", "cache", "retry", "error"):
+                metric = f"gwascat_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, endpoint, label), value in sorted(self.counters.items()):
+                    if counter == name:
+                        labels = _labels(endpoint=endpoint, **{label_names[name]: label})
+                        lines.append(f"{metric}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, lines, metric, histogram, **labels):
+        bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+        for bound, total in zip(bounds, histogram.cumulative()):
+            lines.append(f"{metric}_bucket{_labels(**labels, le=bound)} {total}")
+        lines.append(f"{metric}_sum{_labels(**labels)} {histogram.sum}")
+        lines.append(f"{metric}_count{_labels(**labels)} {histogram.count}")
+
+
+_current_span = contextvars.ContextVar("gwascat_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start", "duration", "attributes", "error")
+
+    def __init__(self, name, span_id, parent_id, attributes):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Tracer:
+    def __init__(self, exporter=None, max_spans=10000):
+        """
+        Minimal tracer recording one span per logical Gwasapi call.
+
+        Spans nest through contextvars, so HTTP requests made on behalf of a
+        paginated or fan-out call are children of its span, also on worker
+        threads started with copy_context(). Finished spans are kept in
+        spans (at most max_spans) and passed to exporter if given.
+        """
+        self.exporter = exporter
+        self.spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+
+    def start(self, name, **attributes):
+        """
+        Start a span as a child of the current one without making it current.
+        Finish it with finish(); use activate() to parent other spans to it.
+        """
+        parent = _current_span.get()
+        return Span(name, next(self._ids), parent.span_id if parent is not None else None, attributes)
+
+    def finish(self, span):
+        span.duration = time.time() - span.start
+        self.spans.append(span)
+        if self.exporter is not None:
+            self.exporter(span)
+
+    @contextmanager
+    def activate(self, span):
+        """
+        Make span the current span inside the with block.
+        """
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Record a span around the with block, nested under the current span.
+        """
+        span = self.start(name, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as exc:
+            span.error = repr(exc)
+            raise
+        finally:
+            self.finish(span)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import zlib
+
+from .endpoints import ENDPOINTS
+from .gwasapi import page_records, next_page_number
+
+# entity name -> (Gwasapi list method, record ID fields)
+ENTITIES = {
+    "studies": ("get_studies", ("accession_id", "accessionId")),
+    "associations": ("get_associations", ("association_id", "associationId")),
+    "snps": ("get_snps", ("rs_id", "rsId")),
+    "efo_traits": ("get_efo_traits", ("efo_id", "efoId")),
+    "publications": ("get_publications", ("pubmed_id", "pubmedId")),
+}
+
+
+def release_of(metadata):
+    """
+    Identify a catalog release by its full metadata document.
+    """
+    return json.dumps(metadata, sort_keys=True)
+
+
+def record_id(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value is not None:
+            return str(value)
+    href = record.get("_links", {}).get("self", {}).get("href")
+    if href:
+        return href.rstrip("/").rsplit("/", 1)[-1]
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Mirror:
+    def __init__(self, path):
+        """
+        Local copy of the GWAS Catalog in a single SQLite file.
+
+        Records are stored per entity as zlib-compressed JSON without their
+        HAL _links, together with a content hash and the release in which they
+        were last seen. Crawl progress is committed with every page, so an
+        interrupted sync resumes from the next page. The ETag, page metadata
+        and record IDs of every crawled page are kept as well, so that pages
+        unchanged in a new release are revalidated instead of downloaded.
+        """
+        import sqlite3
+
+        self.path = path
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "entity TEXT, id TEXT, hash TEXT, release INTEGER, body BLOB, "
+                "PRIMARY KEY (entity, id))"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                "entity TEXT PRIMARY KEY, release INTEGER, next_page INTEGER, done INTEGER)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "entity TEXT, number INTEGER, size INTEGER, etag TEXT, info TEXT, ids TEXT, "
+                "PRIMARY KEY (entity, number))"
+            )
+            self.db.execute("CREATE TABLE IF NOT EXISTS releases (id INTEGER PRIMARY KEY, metadata TEXT UNIQUE)")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def release(self):
+        """
+        Return the metadata of the release the mirror was last synced to, or None.
+        """
+        row = self.db.execute("SELECT metadata FROM releases ORDER BY id DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _release_id(self, metadata):
+        release = release_of(metadata)
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO releases (metadata) VALUES (?)", (release,))
+        return self.db.execute("SELECT id FROM releases WHERE metadata = ?", (release,)).fetchone()[0]
+
+    def sync(self, api, entities=None, page_size=200, progress=None):
+        """
+        Bring the mirror up to date with the catalog release reported by get_metadata.
+
+        Entities already complete for the current release are skipped without
+        any request. Otherwise the entity is crawled page by page through the
+        Gwasapi list endpoint with If-None-Match: pages answered with 304
+        keep their records without downloading them, only records whose
+        content changed are rewritten, and records missing from the new
+        release are deleted.
+        progress, if given, is called as progress(entity, page, total_pages).
+        Returns a dict of per-entity {"added", "changed", "removed"} counts.
+        """
+        release = self._release_id(api.get_metadata())
+        summary = {}
+        for entity in entities or ENTITIES:
+            summary[entity] = self._sync_entity(api, entity, release, page_size, progress)
+        return summary
+
+    def _sync_entity(self, api, entity, release, page_size, progress):
+        method, id_fields = ENTITIES[entity]
+        path, query = ENDPOINTS[method].query({})
+        counts = {"added": 0, "changed": 0, "removed": 0}
+        row = self.db.execute(
+            "SELECT release, next_page, done FROM progress WHERE entity = ?", (entity,)
+        ).fetchone()
+        if row is not None and row[0] == release:
+            if row[2]:
+                return counts
+            number = row[1]
+        else:
+            number = 0
+
+        while number is not None:
+            stored = self.db.execute(
+                "SELECT etag, info, ids FROM pages WHERE entity = ? AND number = ? AND size = ?",
+                (entity, number, page_size),
+            ).fetchone()
+            page, etag = api.get_if_changed(
+                path, dict(query, page=number, size=page_size), stored[0] if stored is not None else None
+            )
+            with self.db:
+                if page is None:
+                    # unchanged since the last sync: its records are carried over to this release
+                    info, ids = json.loads(stored[1]), stored[2]
+                    self.db.executemany(
+                        "UPDATE records SET release = ? WHERE entity = ? AND id = ?",
+                        [(release, entity, id_) for id_ in json.loads(ids)],
+                    )
+                else:
+                    info = page.get("page")
+                    ids = json.dumps([
+                        self._store(entity, record, id_fields, release, counts) for record in page_records(page)
+                    ])
+                self.db.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                    (entity, number, page_size, etag, json.dumps(info), ids),
+                )
+                number = next_page_number({"page": info})
+                self.db.execute(
+                    "INSERT OR REPLACE INTO progress VALUES (?, ?, ?, ?)",
+                    (entity, release, number, int(number is None)),
+                )
+            if progress is not None:
+                info = info or {}
+                progress(entity, info.get("number", 0), info.get("totalPages", 1))
+
+        with self.db:
+            cursor = self.db.execute(
+                "DELETE FROM records WHERE entity = ? AND release != ?", (entity, release)
+            )
+            counts["removed"] = cursor.rowcount
+        return counts
+
+    def _store(self, entity, record, id_fields, release, counts):
+        record.pop("_links", None)
+        body = json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha1(body).hexdigest()
+        id_ = record_id(record, id_fields)
+        row = self.db.execute(
+            "SELECT hash FROM records WHERE entity = ? AND id = ?", (entity, id_)
+        ).fetchone()
+        if row is not None and row[0] == digest:
+            self.db.execute(
+                "UPDATE records SET release = ? WHERE entity = ? AND id = ?", (release, entity, id_)
+            )
+            return id_
+        counts["added" if row is None else "changed"] += 1
+        self.db.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+            (entity, id_, digest, release, zlib.compress(body)),
+        )
+        return id_
+
+    def get(self, entity, id_):
+        """
+        Return one mirrored record by entity name and ID, or None.
+        """
+        row = self.db.execute(
+            "SELECT body FROM records WHERE entity = ? AND id = ?", (entity, str(id_))
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row is not None else None
+
+    def records(self, entity):
+        """
+        Iterate over all mirrored records of an entity.
+        """
+        cursor = self.db.execute("SELECT body FROM records WHERE entity = ? ORDER BY id", (entity,))
+        for (body,) in cursor:
+            yield json.loads(zlib.decompress(body))
+
+    def count(self, entity):
+        return self.db.execute("SELECT COUNT(*) FROM records WHERE entity = ?", (entity,)).fetchone()[0]
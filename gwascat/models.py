@@ -0,0 +1,218 @@
+import sys
+from functools import lru_cache
+
+_UNSET = object()
+
+
+def _camel(name):
+    head, *tail = name.split("_")
+    return head + "".join(part.title() for part in tail)
+
+
+@lru_cache(maxsize=None)
+def _keys(cls):
+    """
+    Return ((field, camelCaseKey), ...) for a record class and a dict mapping API keys to fields.
+    """
+    pairs = tuple((name, _camel(name)) for name in cls.__slots__)
+    lookup = {}
+    for name, camel in pairs:
+        lookup[name] = name
+        lookup[camel] = name
+    return pairs, lookup
+
+
+@lru_cache(maxsize=None)
+def _default_decoder():
+    from .decoding import get_decoder
+    return get_decoder()
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [_intern(item) for item in value]
+    if isinstance(value, dict):
+        return {sys.intern(key): _intern(item) for key, item in value.items()}
+    return value
+
+
+class Record:
+    """
+    Compact base class for GWAS Catalog records.
+
+    Subclasses list their fields in __slots__ (plus _source and _extra) and
+    the fields whose strings repeat across records in INTERN. A record built
+    from raw JSON text or bytes (as yielded by iter_*(model=...)) keeps only
+    that text until a field is first accessed; the document is then decoded
+    once into the slots, with the decode function given (iter_* passes the
+    client's) or the fastest installed one (see gwascat.decoding). HAL _links are dropped, fields not declared by the
+    class are kept in _extra.
+
+    Records also support read-only dict access by API key or field name.
+    Declared fields the API did not send stay unset: they read as None as
+    attributes but raise KeyError as items, like a missing dict key.
+    """
+    __slots__ = ("_source", "_extra")
+    INTERN = frozenset()
+
+    def __init__(self, source, decode=None):
+        if isinstance(source, (bytes, str)):
+            self._source = source
+            # _extra is only filled when decoding, so until then it holds the decoder
+            self._extra = decode
+        else:
+            self._source = None
+            self._load(source)
+
+    @classmethod
+    def fields(cls):
+        return cls.__slots__
+
+    @classmethod
+    def from_page(cls, page):
+        """
+        Return the records embedded in a HAL page as instances of this class.
+        """
+        from .gwasapi import page_records
+        return [cls(record) for record in page_records(page)]
+
+    def _load(self, data):
+        pairs, lookup = _keys(type(self))
+        for name, camel in pairs:
+            value = data.get(name, _UNSET)
+            if value is _UNSET:
+                value = data.get(camel, _UNSET)
+                if value is _UNSET:
+                    continue
+            if name in self.INTERN:
+                value = _intern(value)
+            setattr(self, name, value)
+        extra = None
+        for key, value in data.items():
+            if key != "_links" and key not in lookup:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def _materialize(self):
+        source, decode = self._source, self._extra
+        self._source = None
+        self._load((decode or _default_decoder())(source))
+
+    def __getattr__(self, name):
+        # only called for unset slots: before the source has been decoded, or for absent fields
+        if name in self.__slots__:
+            if object.__getattribute__(self, "_source") is not None:
+                self._materialize()
+                return getattr(self, name)
+            return None
+        raise AttributeError(name)
+
+    def _present(self, name):
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        if self._source is not None:
+            self._materialize()
+        name = _keys(type(self))[1].get(key)
+        if name is not None and self._present(name):
+            return object.__getattribute__(self, name)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key, _UNSET) is not _UNSET
+
+    def keys(self):
+        if self._source is not None:
+            self._materialize()
+        return [name for name in self.fields() if self._present(name)] + list(self._extra or ())
+
+    def to_dict(self):
+        """
+        Return the record as a plain dict keyed by field name.
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        name = self.fields()[0]
+        return f"{type(self).__name__}({name}={getattr(self, name)!r})"
+
+
+class Study(Record):
+    __slots__ = (
+        "accession_id", "pubmed_id", "disease_trait", "efo_traits", "background_efo_traits",
+        "mapped_genes", "initial_sample_size", "replication_sample_size", "cohort",
+        "full_pvalue_set", "gxe", "snp_count", "genotyping_technologies",
+    )
+    INTERN = frozenset({"disease_trait", "efo_traits", "background_efo_traits", "mapped_genes",
+                        "cohort", "genotyping_technologies"})
+
+
+class Association(Record):
+    __slots__ = (
+        "association_id", "accession_id", "pubmed_id", "risk_frequency", "p_value",
+        "pvalue_mantissa", "pvalue_exponent", "beta", "ci_lower", "ci_upper", "or_value",
+        "range", "snp_effect_allele", "locations", "mapped_genes", "efo_traits",
+        "reported_trait", "first_author", "snp_type", "multiple_snp_haplotype",
+        "snp_interaction",
+    )
+    INTERN = frozenset({"accession_id", "locations", "mapped_genes", "efo_traits",
+                        "reported_trait", "first_author", "snp_type"})
+
+
+class SNP(Record):
+    __slots__ = (
+        "rs_id", "merged", "functional_class", "locations", "mapped_genes", "alleles", "maf",
+    )
+    INTERN = frozenset({"functional_class", "locations", "mapped_genes", "alleles"})
+
+
+class Locus(Record):
+    __slots__ = (
+        "locus_id", "haplotype_snp_count", "description", "strongest_risk_alleles",
+    )
+    INTERN = frozenset({"description"})
+
+
+class GenomicContext(Record):
+    __slots__ = (
+        "gene", "location", "distance", "source", "mapping_method", "is_intergenic",
+        "is_upstream", "is_downstream", "is_closest_gene",
+    )
+    INTERN = frozenset({"gene", "location", "source", "mapping_method"})
+
+
+class EfoTrait(Record):
+    __slots__ = (
+        "efo_id", "efo_trait", "uri",
+    )
+    INTERN = frozenset({"efo_trait"})
+
+
+class Gene(Record):
+    __slots__ = (
+        "gene_name", "ensembl_gene_ids", "entrez_gene_ids", "location", "description",
+    )
+    INTERN = frozenset({"gene_name", "location"})
+
+
+class Publication(Record):
+    __slots__ = (
+        "pubmed_id", "title", "first_author", "publication_date", "journal", "author_list",
+    )
+    INTERN = frozenset({"first_author", "journal"})
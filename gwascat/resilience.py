@@ -0,0 +1,168 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        """
+        Token-bucket rate limiter allowing rate requests per second on average
+        and bursts of up to burst requests.
+
+        One instance can be shared by several threads and asyncio tasks, and
+        by Gwasapi and AsyncGwasapi clients at the same time: each caller
+        reserves a token under a lock and then sleeps until its turn.
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Block the calling thread until a request may be sent.
+        """
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Suspend the calling task until a request may be sent.
+        """
+        import asyncio
+
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        total=5,
+        backoff_factor=0.5,
+        max_backoff=60,
+        statuses=(429, 500, 502, 503, 504),
+        respect_retry_after=True
+    ):
+        """
+        Retry policy for idempotent GET requests.
+
+        Responses with a status in statuses and connection errors or timeouts
+        are retried up to total times. The delay before retry n is drawn
+        uniformly from [0, backoff_factor * 2**n] capped at max_backoff
+        ("full jitter"), unless the server sent a Retry-After header.
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, attempt, status=None):
+        """
+        Return True if a request that failed on the given attempt (0-based) should be retried.
+        status is None for connection errors and timeouts.
+        """
+        if attempt >= self.total:
+            return False
+        return status is None or status in self.statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Return the number of seconds to wait before retrying after the given attempt.
+        """
+        if retry_after and self.respect_retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+    Returns the delay in seconds, or None if the value cannot be parsed.
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Circuit breaker that fails fast while the API is down.
+
+        After failure_threshold consecutive transient failures the circuit
+        opens and requests raise CircuitOpenError. Once reset_timeout seconds
+        have passed a single trial request is let through; its success closes
+        the circuit again, its failure re-opens it.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if no request may be sent right now.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if self._trial or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("GWAS Catalog API circuit is open after repeated failures")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release_trial(self):
+        """
+        Give up a trial request that ended without an outcome (it was
+        interrupted or cancelled), so that the next call is let through.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
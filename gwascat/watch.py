@@ -0,0 +1,225 @@
+import hashlib
+import json
+import time
+import zlib
+from collections import namedtuple
+
+from .endpoints import ENDPOINTS
+from .gwasapi import page_records
+from .mirror import ENTITIES, record_id, release_of
+
+# list method -> record ID fields
+ID_FIELDS = {method: fields for method, fields in ENTITIES.values()}
+
+Diff = namedtuple("Diff", ["name", "skipped", "added", "changed", "removed", "pages", "fetched", "error"])
+
+
+def _encode(record):
+    record = {key: value for key, value in record.items() if key != "_links"}
+    return json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class Watch:
+    def __init__(self, path):
+        """
+        Saved list queries whose results are checked for changes, in a single SQLite file.
+
+        For every query the last seen catalog release, the ETag and content
+        hash of each result page and a hash and copy of each record are kept.
+        check() skips queries outright while get_metadata reports the same
+        release. After a new release each page is revalidated with
+        If-None-Match; pages answered with 304, or whose records hash as
+        before, are not diffed, and only the records of the remaining pages
+        are compared by ID.
+        """
+        import sqlite3
+
+        self.path = path
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "name TEXT PRIMARY KEY, method TEXT, params TEXT, page_size INTEGER, "
+                "release TEXT, pages INTEGER, checked_at REAL)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "query TEXT, number INTEGER, etag TEXT, hash TEXT, PRIMARY KEY (query, number))"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "query TEXT, id TEXT, page INTEGER, hash TEXT, body BLOB, PRIMARY KEY (query, id))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS records_page ON records (query, page)")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, name, method="get_associations", page_size=200, **params):
+        """
+        Save a query: a paginated Gwasapi list method and its parameters,
+        e.g. add("asthma", efo_id="MONDO_0004979", show_child_trait=True).
+        Replacing a saved query discards its stored results.
+        """
+        endpoint = ENDPOINTS.get(method)
+        if endpoint is None or not endpoint.paginated or endpoint.args:
+            raise ValueError(f"{method!r} is not a paginated list method")
+        known = {param for param, _ in endpoint.params} - {"page", "size"}
+        unknown = set(params) - known
+        if unknown:
+            raise ValueError(f"{method}() has no parameter {', '.join(sorted(unknown))}")
+        self.remove(name)
+        with self.db:
+            self.db.execute(
+                "INSERT INTO queries VALUES (?, ?, ?, ?, NULL, 0, NULL)",
+                (name, method, json.dumps(params, sort_keys=True), page_size),
+            )
+
+    def remove(self, name):
+        with self.db:
+            for table, column in (("queries", "name"), ("pages", "query"), ("records", "query")):
+                self.db.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+
+    def queries(self):
+        """
+        Return the saved queries as {name: (method, params)}.
+        """
+        rows = self.db.execute("SELECT name, method, params FROM queries ORDER BY name")
+        return {name: (method, json.loads(params)) for name, method, params in rows}
+
+    def records(self, name):
+        """
+        Iterate over the stored results of a query, without their HAL _links.
+        """
+        cursor = self.db.execute("SELECT body FROM records WHERE query = ? ORDER BY page, id", (name,))
+        for (body,) in cursor:
+            yield json.loads(zlib.decompress(body))
+
+    def check(self, api, names=None, max_workers=None, force=False):
+        """
+        Check saved queries (default: all) against the catalog and store their new results.
+
+        get_metadata is requested once per call; queries last checked at the
+        same release are skipped without further requests unless force is
+        set. Yields one Diff(name, skipped, added, changed, removed, pages,
+        fetched, error) per query: added and changed hold the new records,
+        removed the IDs of records no longer returned, pages the page count
+        and fetched the pages whose body had to be downloaded. The first
+        check of a query reports all its records as added. Pages of a query
+        are revalidated concurrently by up to max_workers threads.
+
+        A query whose pages cannot be fetched is reported with the exception
+        as error and its stored results unchanged, and the sweep goes on
+        with the next query.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        release = release_of(api.get_metadata())
+        rows = self.db.execute("SELECT name, method, params, page_size, release, pages FROM queries ORDER BY name")
+        selected = None if names is None else set(names)
+        executor = None
+        try:
+            for name, method, params, page_size, checked, pages in rows.fetchall():
+                if selected is not None and name not in selected:
+                    continue
+                if checked == release and not force:
+                    yield Diff(name, True, [], [], [], pages, 0, None)
+                    continue
+                if executor is None:
+                    # one pool for the whole sweep; starting threads per query costs more than a 304
+                    executor = ThreadPoolExecutor(max_workers=max_workers or api.max_workers)
+                try:
+                    diff = self._refresh(api, executor, name, method, json.loads(params), page_size, release)
+                except Exception as error:
+                    diff = Diff(name, False, [], [], [], pages, 0, error)
+                yield diff
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _refresh(self, api, executor, name, method, params, page_size, release):
+        path, query = ENDPOINTS[method].query(params)
+        query["size"] = page_size
+        stored = {
+            number: (etag, digest) for number, etag, digest in
+            self.db.execute("SELECT number, etag, hash FROM pages WHERE query = ?", (name,))
+        }
+
+        def fetch(number):
+            return api.get_if_changed(path, dict(query, page=number), stored.get(number, (None, None))[0])
+
+        first = fetch(0)
+        if first[0] is None:
+            # an unchanged first page still names the page count in its stored result
+            total = self.db.execute("SELECT pages FROM queries WHERE name = ?", (name,)).fetchone()[0]
+        else:
+            total = max(1, (first[0].get("page") or {}).get("totalPages", 1))
+        results = {0: first}
+        results.update(zip(range(1, total), executor.map(fetch, range(1, total))))
+
+        page_rows = []
+        changed_pages = {}
+        fetched = 0
+        for number, (page, etag) in sorted(results.items()):
+            digest = stored.get(number, (None, None))[1]
+            if page is not None:
+                fetched += 1
+                encoded = [(record, _encode(record)) for record in page_records(page)]
+                page_digest = hashlib.sha1(b"\n".join(body for _, body in encoded)).hexdigest()
+                if page_digest != digest:
+                    changed_pages[number] = encoded
+                    digest = page_digest
+            page_rows.append((name, number, etag, digest))
+        # pages past the new end hold only removed records
+        for number in stored:
+            if number >= total:
+                changed_pages[number] = []
+
+        added, changed, removed = [], [], []
+        id_fields = ID_FIELDS.get(method, ())
+        with self.db:
+            old = {}
+            for number in changed_pages:
+                old.update(self.db.execute(
+                    "SELECT id, hash FROM records WHERE query = ? AND page = ?", (name, number)
+                ))
+            seen = set()
+            for number, encoded in changed_pages.items():
+                for record, body in encoded:
+                    id_ = record_id(record, id_fields)
+                    seen.add(id_)
+                    digest = hashlib.sha1(body).hexdigest()
+                    previous = old.get(id_)
+                    if previous is None:
+                        row = self.db.execute(
+                            "SELECT hash FROM records WHERE query = ? AND id = ?", (name, id_)
+                        ).fetchone()
+                        previous = row[0] if row is not None else None
+                    if previous == digest:
+                        # moved to another page, content unchanged
+                        self.db.execute(
+                            "UPDATE records SET page = ? WHERE query = ? AND id = ?", (number, name, id_)
+                        )
+                        continue
+                    (added if previous is None else changed).append(record)
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+                        (name, id_, number, digest, zlib.compress(body)),
+                    )
+            removed = sorted(id_ for id_ in old if id_ not in seen)
+            self.db.executemany(
+                "DELETE FROM records WHERE query = ? AND id = ?", [(name, id_) for id_ in removed]
+            )
+            self.db.execute("DELETE FROM pages WHERE query = ? AND number >= ?", (name, total))
+            self.db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", page_rows)
+            self.db.execute(
+                "UPDATE queries SET release = ?, pages = ?, checked_at = ? WHERE name = ?",
+                (release, total, time.time(), name),
+            )
+        return Diff(name, False, added, changed, removed, total, fetched, None)
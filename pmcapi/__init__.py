@@ -0,0 +1,23 @@
+import importlib
+
+# public name -> defining submodule, imported on first attribute access (PEP 562)
+_EXPORTS = {
+    "Pmcapi": ".pmcapi",
+    "parse_article": ".pmcapi",
+    "TextIndex": ".textindex",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,295 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from xml.etree import ElementTree
+
+from gwascat.http import BulkResult, HTTPClient, bulk_map
+from gwascat.resilience import RetryPolicy, TokenBucket
+
+from .textindex import TextIndex
+
+IDCONV_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/"
+EUROPEPMC_URL = "https://www.ebi.ac.uk/europepmc/webservices/rest"
+
+_SPACE = re.compile(r"\s+")
+# elements that start a new block of text; inline ones (italic, xref, sup) are joined without a space
+_BLOCKS = {"p", "sec", "title", "list-item", "caption", "label", "td", "th", "abstract"}
+
+
+def normalize_pmcid(pmcid):
+    """
+    Return a PMC ID in the "PMC1234567" form; bare numbers are prefixed.
+    """
+    pmcid = str(pmcid).strip().upper()
+    return pmcid if pmcid.startswith("PMC") else "PMC" + pmcid
+
+
+def _text(element, skip=("title",)):
+    """
+    Return the whitespace-normalized text of an element and its children,
+    leaving out direct children whose tag is in skip (a section's own title).
+    """
+    if element is None:
+        return ""
+    parts = []
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        if child.tag not in skip:
+            text = _text(child, skip=())
+            parts.append(f" {text} " if child.tag in _BLOCKS else text)
+        if child.tail:
+            parts.append(child.tail)
+    return _SPACE.sub(" ", "".join(parts)).strip()
+
+
+def parse_article(xml):
+    """
+    Parse a JATS full-text article (as served by Europe PMC fullTextXML) into
+    a dict with "pmcid", "pmid", "title" and "sections", a list of
+    {"title", "text"} dicts: the abstract, then one per top-level body
+    section (paragraphs outside any section are collected as "Body").
+    """
+    root = ElementTree.fromstring(xml)
+    article = root if root.tag == "article" else root.find(".//article")
+    if article is None:
+        raise ValueError("no <article> element in full-text XML")
+    meta = article.find("front/article-meta")
+    ids = {}
+    if meta is not None:
+        for element in meta.findall("article-id"):
+            ids[element.get("pub-id-type")] = (element.text or "").strip()
+    pmcid = ids.get("pmcid") or ids.get("pmc")
+    title = _text(meta.find("title-group/article-title"), skip=()) if meta is not None else ""
+
+    sections = []
+    if meta is not None:
+        abstract = " ".join(_text(element) for element in meta.findall("abstract"))
+        if abstract:
+            sections.append({"title": "Abstract", "text": abstract})
+    body = article.find("body")
+    if body is not None:
+        loose = []
+        for child in body:
+            if child.tag == "sec":
+                text = _text(child)
+                if text:
+                    sections.append({"title": _text(child.find("title"), skip=()), "text": text})
+            else:
+                loose.append(_text(child))
+        loose = " ".join(text for text in loose if text)
+        if loose:
+            sections.append({"title": "Body", "text": loose})
+    return {
+        "pmcid": normalize_pmcid(pmcid) if pmcid else None,
+        "pmid": ids.get("pmid"),
+        "title": title,
+        "sections": sections,
+    }
+
+
+class Pmcapi:
+    def __init__(
+        self,
+        cache_dir,
+        idconv_url=IDCONV_URL,
+        europepmc_url=EUROPEPMC_URL,
+        tool="biora",
+        email=None,
+        api_key=None,
+        batch_size=200,
+        max_workers=8,
+        negative_ttl=30 * 86400,
+        idconv_rate_limiter=None,
+        rate_limiter=None,
+        timeout=(5, 60),
+        retry=RetryPolicy(),
+        session=None,
+        transport=None
+    ):
+        """
+        Client resolving PubMed IDs to PMC full text, with a local cache and search index.
+
+        PMIDs are converted to PMCIDs with the NCBI ID converter in batches
+        of batch_size (tool, email and api_key are passed as NCBI asks).
+        Full-text XML is fetched from Europe PMC by up to max_workers threads
+        and parsed into sections (see parse_article). ID mappings and parsed
+        sections are kept in cache_dir/pmc.db, so each PMID and article is
+        requested once. Negative results (no PMC copy, no open full text)
+        are asked again once they are older than negative_ttl seconds, as
+        papers are deposited in PMC or opened later; None keeps them for
+        good. Every cached article is also added to a local SQLite FTS5
+        index queried with search().
+
+        idconv_rate_limiter defaults to 3 requests per second (10 with an
+        api_key), rate_limiter for Europe PMC to 10; both are
+        gwascat.resilience.TokenBucket instances and may be shared. timeout,
+        retry, session and transport configure the gwascat.http.HTTPClient
+        used for all requests.
+        """
+        import sqlite3
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.idconv_url = idconv_url
+        self.europepmc_url = europepmc_url.rstrip("/")
+        self.tool = tool
+        self.email = email
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.negative_ttl = negative_ttl
+        if idconv_rate_limiter is None:
+            idconv_rate_limiter = TokenBucket(10 if api_key else 3)
+        self.idconv_rate_limiter = idconv_rate_limiter
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket(10)
+        self.http = HTTPClient(timeout, None, retry, session, transport, pool_size=max(10, max_workers))
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, "pmc.db"), check_same_thread=False)
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS idmap (pmid TEXT PRIMARY KEY, pmcid TEXT, checked_at REAL)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "pmcid TEXT PRIMARY KEY, pmid TEXT, title TEXT, sections BLOB, fetched_at REAL)"
+            )
+        self.index = TextIndex(self.db, self._lock)
+
+    def close(self):
+        """
+        Close the pooled session and the cache database.
+        """
+        self.http.close()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def convert_ids(self, pmids):
+        """
+        Map PubMed IDs to PMC IDs. Returns a dict pmid -> PMCID, or None for
+        articles without a PMC copy. Only PMIDs missing from the cache, or
+        cached without a PMC copy for longer than negative_ttl, are sent to
+        the ID converter, batch_size per request.
+        """
+        pmids = list(dict.fromkeys(str(pmid).strip() for pmid in pmids))
+        result = {}
+        missing = []
+        for start in range(0, len(pmids), 500):
+            chunk = pmids[start:start + 500]
+            rows = self.db.execute(
+                f"SELECT pmid, pmcid, checked_at FROM idmap WHERE pmid IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            result.update((pmid, pmcid) for pmid, pmcid, checked_at in rows if not self._expired(pmcid, checked_at))
+            missing.extend(pmid for pmid in chunk if pmid not in result)
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            found = self._convert_batch(batch)
+            now = time.time()
+            with self._lock, self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO idmap VALUES (?, ?, ?)",
+                    [(pmid, found.get(pmid), now) for pmid in batch],
+                )
+            for pmid in batch:
+                result[pmid] = found.get(pmid)
+        return {pmid: result[pmid] for pmid in pmids}
+
+    def _convert_batch(self, pmids):
+        params = {"ids": ",".join(pmids), "idtype": "pmid", "format": "json", "tool": self.tool}
+        if self.email:
+            params["email"] = self.email
+        if self.api_key:
+            params["api_key"] = self.api_key
+        response = self.http.get(self.idconv_url, params, rate_limiter=self.idconv_rate_limiter)
+        found = {}
+        for record in response.json().get("records", []):
+            pmid, pmcid = record.get("pmid"), record.get("pmcid")
+            if pmid and pmcid and record.get("status") != "error":
+                found[str(pmid)] = normalize_pmcid(pmcid)
+        return found
+
+    def _expired(self, value, checked_at):
+        """
+        Return True for a negative cache entry (value None) older than negative_ttl.
+        """
+        return value is None and self.negative_ttl is not None and time.time() - checked_at > self.negative_ttl
+
+    def _cached_article(self, pmcid):
+        row = self.db.execute(
+            "SELECT pmid, title, sections, fetched_at FROM articles WHERE pmcid = ?", (pmcid,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        pmid, title, sections, fetched_at = row
+        if sections is None:
+            return not self._expired(None, fetched_at), None
+        return True, {"pmcid": pmcid, "pmid": pmid, "title": title, "sections": json.loads(zlib.decompress(sections))}
+
+    def get_article(self, pmcid):
+        """
+        Return the parsed full text of one article (see parse_article), or
+        None if Europe PMC has no open full text for it. Cached after the
+        first call and added to the search index.
+        """
+        pmcid = normalize_pmcid(pmcid)
+        cached, article = self._cached_article(pmcid)
+        if cached:
+            return article
+        url = f"{self.europepmc_url}/{pmcid}/fullTextXML"
+        response = self.http.get(url, rate_limiter=self.rate_limiter, allow=(404,))
+        article = None if response.status_code == 404 else parse_article(response.content)
+        if article is not None:
+            article["pmcid"] = pmcid
+        self._store(pmcid, article)
+        return article
+
+    def _store(self, pmcid, article):
+        now = time.time()
+        with self._lock, self.db:
+            if article is None:
+                self.db.execute("INSERT OR REPLACE INTO articles VALUES (?, NULL, NULL, NULL, ?)", (pmcid, now))
+                return
+            sections = zlib.compress(json.dumps(article["sections"]).encode("utf-8"))
+            self.db.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?)",
+                (pmcid, article["pmid"], article["title"], sections, now),
+            )
+            self.index.add(article, commit=False)
+
+    def get_articles(self, pmcids, max_workers=None):
+        """
+        Fetch many articles concurrently, skipping duplicates; cached ones
+        are answered without a request. Yields BulkResult(id, value, error)
+        tuples in completion order (see gwascat.http.bulk_map); value is None
+        for articles without open full text.
+        """
+        ids = (normalize_pmcid(pmcid) for pmcid in pmcids)
+        return bulk_map(self.get_article, ids, max_workers or self.max_workers)
+
+    def get_articles_for_pmids(self, pmids, max_workers=None):
+        """
+        Resolve PubMed IDs and fetch the full text of those with a PMC copy.
+        Yields BulkResult(pmid, article or None, error) in completion order.
+        """
+        pmcids = self.convert_ids(pmids)
+        pmids_of = {}
+        for pmid, pmcid in pmcids.items():
+            if pmcid is None:
+                yield BulkResult(pmid, None, None)
+            else:
+                pmids_of.setdefault(pmcid, []).append(pmid)
+        for result in self.get_articles(pmids_of, max_workers):
+            for pmid in pmids_of[result.id]:
+                yield result._replace(id=pmid)
+
+    def search(self, query, limit=20):
+        """
+        Search the sections of all cached articles; see TextIndex.search.
+        """
+        return self.index.search(query, limit)
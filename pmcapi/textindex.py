@@ -0,0 +1,62 @@
+import threading
+from collections import namedtuple
+
+SearchHit = namedtuple("SearchHit", ["pmcid", "section", "snippet", "score"])
+
+
+class TextIndex:
+    def __init__(self, db, lock=None):
+        """
+        Inverted index over article sections in an SQLite FTS5 table.
+
+        db is an sqlite3 connection (the Pmcapi cache database, or any other
+        file), lock serializes writes when the connection is shared between
+        threads. Words are indexed with the porter stemmer, so "genes"
+        matches "gene".
+        """
+        self.db = db
+        self._lock = lock or threading.Lock()
+        with self.db:
+            self.db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts "
+                "USING fts5(pmcid UNINDEXED, section, text, tokenize='porter unicode61')"
+            )
+
+    def add(self, article, commit=True):
+        """
+        Index (or re-index) the sections of a parsed article.
+        With commit=False the caller holds the lock and commits.
+        """
+        rows = [(article["pmcid"], "Title", article["title"])] if article.get("title") else []
+        rows.extend((article["pmcid"], section["title"], section["text"]) for section in article["sections"])
+        if not commit:
+            self._replace(article["pmcid"], rows)
+            return
+        with self._lock, self.db:
+            self._replace(article["pmcid"], rows)
+
+    def _replace(self, pmcid, rows):
+        self.db.execute("DELETE FROM sections_fts WHERE pmcid = ?", (pmcid,))
+        self.db.executemany("INSERT INTO sections_fts (pmcid, section, text) VALUES (?, ?, ?)", rows)
+
+    def remove(self, pmcid):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM sections_fts WHERE pmcid = ?", (pmcid,))
+
+    def search(self, query, limit=20):
+        """
+        Return the best matching sections as SearchHit(pmcid, section,
+        snippet, score) tuples, best first. query uses the FTS5 syntax:
+        words, "phrases", AND/OR/NOT, prefix*, and column filters such as
+        section:methods.
+        """
+        rows = self.db.execute(
+            "SELECT pmcid, section, snippet(sections_fts, 2, '[', ']', '...', 16), bm25(sections_fts) "
+            "FROM sections_fts WHERE sections_fts MATCH ? ORDER BY bm25(sections_fts) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+        # bm25() is lower for better matches; report it negated so higher is better
+        return [SearchHit(pmcid, section, snippet, -score) for pmcid, section, snippet, score in rows]
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(DISTINCT pmcid) FROM sections_fts").fetchone()[0]
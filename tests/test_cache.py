@@ -0,0 +1,43 @@
+"""
+Release invalidation of the Gwasapi response cache, against the benchmark mock server.
+"""
+import copy
+
+import pytest
+
+from benchmarks.mockserver import MockGwasServer
+from gwascat import Gwasapi
+from gwascat.cache import SQLiteCache
+
+
+@pytest.fixture
+def server():
+    with MockGwasServer() as server:
+        yield server
+
+
+def new_release(server, name):
+    metadata = copy.deepcopy(server.fixtures["metadata"])
+    metadata["dbRelease"] = name
+    server.fixtures["metadata"] = metadata
+
+
+def test_release_is_compared_again_after_metadata_ttl(server, tmp_path):
+    api = Gwasapi(base_url=server.base_url, cache=SQLiteCache(str(tmp_path / "cache.db")), metadata_ttl=0)
+    api.get_snp("rs1")
+    new_release(server, "next")
+    assert api.get_metadata()["dbRelease"] == "next"
+    requests = server.requests
+    api.get_snp("rs1")
+    # the metadata is revalidated and the SNP fetched again from the new release
+    assert server.requests - requests == 2
+
+
+def test_release_is_remembered_within_metadata_ttl(server, tmp_path):
+    api = Gwasapi(base_url=server.base_url, cache=SQLiteCache(str(tmp_path / "cache.db")), metadata_ttl=3600)
+    api.get_snp("rs1")
+    new_release(server, "next")
+    requests = server.requests
+    api.get_snp("rs1")
+    api.get_snp("rs1")
+    assert server.requests == requests
@@ -0,0 +1,100 @@
+"""
+Chunk-boundary tests for gwascat.decoding.PageStream.
+
+Pages recorded by the benchmark mock server, and pages with scalar list
+members, are split into chunks of random sizes; every split must parse
+to the same records as decoding the whole body at once.
+"""
+import json
+import random
+import urllib.request
+
+import pytest
+
+from benchmarks.mockserver import MockGwasServer
+from gwascat import Gwasapi
+from gwascat.decoding import PageStream
+
+
+def chunked(data, rng, max_size):
+    chunks = []
+    position = 0
+    while position < len(data):
+        size = rng.randint(1, max_size)
+        chunks.append(data[position:position + size])
+        position += size
+    return chunks
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockGwasServer(pages=2, size=25) as server:
+        yield server
+
+
+@pytest.mark.parametrize("collection", ["associations", "studies", "single-nucleotide-polymorphisms"])
+def test_mock_pages_parse_at_every_chunk_size(server, collection):
+    with urllib.request.urlopen(f"{server.base_url}/{collection}?size=25") as response:
+        data = response.read()
+    page = json.loads(data)
+    expected = next(iter(page["_embedded"].values()))
+    rng = random.Random(collection)
+    for max_size in (1, 2, 3, 7, 64, 4096):
+        stream = PageStream(chunked(data, rng, max_size))
+        assert list(stream) == expected
+        assert stream.page == page["page"]
+
+
+def test_raw_records_match_decoded_records(server):
+    with urllib.request.urlopen(f"{server.base_url}/associations?size=25") as response:
+        data = response.read()
+    expected = json.loads(data)["_embedded"]["associations"]
+    rng = random.Random(0)
+    for max_size in (1, 5, 33):
+        stream = PageStream(chunked(data, rng, max_size), raw=True)
+        assert [json.loads(text) for text in stream] == expected
+
+
+def test_scalar_members_split_inside_numbers():
+    values = [0, 0.5, -2.5e-3, 1e10, -7, 123456789, 3.25E+2, True, None, 'a"b\\', [1.5, -0.0]]
+    body = json.dumps({"_embedded": {"values": values}, "page": {"number": 0}}).encode("utf-8")
+    rng = random.Random(1)
+    for _ in range(2000):
+        stream = PageStream(chunked(body, rng, rng.randint(1, 8)))
+        assert list(stream) == values
+
+
+@pytest.mark.parametrize("split", ["0.", "-2.5e", "-2.5e-", "1"])
+def test_number_prefix_at_chunk_end(split):
+    body = b'{"_embedded": {"values": [0.5, -2.5e-3, 12]}}'
+    cut = body.index(split.encode("ascii")) + len(split)
+    assert list(PageStream([body[:cut], body[cut:]])) == [0.5, -2.5e-3, 12]
+
+
+def test_streamed_iteration_matches_buffered(server):
+    with Gwasapi(base_url=server.base_url) as api:
+        streamed = list(api.iter_associations(size=25, stream=True))
+        buffered = list(api.iter_associations(size=25))
+    assert streamed == buffered
+    assert len(streamed) == 50
+
+
+def test_lazy_models_decode_with_the_client_decoder(server):
+    from gwascat.models import Association
+
+    decoded = []
+    with Gwasapi(base_url=server.base_url) as api:
+        decode = api.decode
+
+        def counting(data):
+            decoded.append(data)
+            return decode(data)
+
+        api.decode = counting
+        records = list(api.iter_associations(size=25, model=Association))
+        buffered = list(api.iter_associations(size=25))
+    decoded.clear()
+    assert [record.to_dict() for record in records] == [
+        {key: value for key, value in record.items() if key != "_links"} for record in buffered
+    ]
+    assert len(decoded) == 50
@@ -0,0 +1,76 @@
+"""
+gwascat.localquery.LocalGwasapi over an in-memory stand-in for a Mirror.
+"""
+import random
+
+import pytest
+
+from gwascat.localquery import LocalGwasapi
+
+
+class FakeMirror:
+    release = {"dbRelease": "test"}
+
+    def __init__(self, **records):
+        self._records = records
+
+    def records(self, entity):
+        return iter(self._records.get(entity, []))
+
+
+def snp(number, chromosome, position):
+    return {"rs_id": f"rs{number}", "locations": [{"chromosome_name": chromosome, "chromosome_position": position}]}
+
+
+@pytest.fixture
+def snps():
+    records = [snp(number, str(1 + number % 3), 1000 + number) for number in range(30)]
+    records.append(snp(100, "X", "unknown"))
+    records.append({"rs_id": "rs101", "locations": ["7:"]})
+    return LocalGwasapi(FakeMirror(snps=records))
+
+
+def rs_ids(page):
+    return [record["rs_id"] for record in page["_embedded"]["snps"]]
+
+
+def test_bp_bounds_without_chromosome_apply_to_every_chromosome(snps):
+    page = snps.get_snps(bp_start=1005, bp_end=1009, size=100)
+    assert rs_ids(page) == ["rs5", "rs6", "rs7", "rs8", "rs9"]
+    assert rs_ids(snps.get_snps(bp_location=1012)) == ["rs12"]
+    assert rs_ids(snps.get_snps(chromosome="2", bp_start=1005, bp_end=1009)) == ["rs7"]
+
+
+def test_unparsable_locations_are_left_out_of_the_interval_index(snps):
+    assert snps.get_snps(bp_start=0, size=100)["page"]["totalElements"] == 30
+    assert rs_ids(snps.get_snps(rs_id="rs100")) == ["rs100"]
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_sorted_pages_match_sorting_every_record(direction):
+    rng = random.Random(direction)
+    records = [
+        {"accession_id": f"GCST{number}", "pubmed_id": str(rng.randint(1, 5)),
+         "initial_sample_size": rng.choice([None, 10, 20, 30])}
+        for number in range(95)
+    ]
+    studies = LocalGwasapi(FakeMirror(studies=records))
+    for pubmed_id in (None, "3"):
+        matching = [record for record in records if pubmed_id is None or record["pubmed_id"] == pubmed_id]
+        expected = sorted(
+            matching,
+            key=lambda record: (record["initial_sample_size"] is None, record["initial_sample_size"]),
+            reverse=direction == "desc",
+        )
+        pages = []
+        number = 0
+        while True:
+            page = studies.get_studies(
+                pubmed_id=pubmed_id, sort="initial_sample_size", direction=direction, page=number, size=10
+            )
+            pages.extend(page["_embedded"]["studies"])
+            number += 1
+            if number >= page["page"]["totalPages"]:
+                break
+        assert pages == expected
+        assert page["page"]["totalElements"] == len(matching)
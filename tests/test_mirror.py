@@ -0,0 +1,83 @@
+"""
+Incremental Mirror.sync against the benchmark mock server.
+"""
+import copy
+from collections import Counter
+
+import pytest
+
+from benchmarks.mockserver import MockGwasServer
+from gwascat import Gwasapi
+from gwascat.mirror import Mirror
+
+
+@pytest.fixture
+def server():
+    with MockGwasServer(pages=5, size=10) as server:
+        yield server
+
+
+def client(server, statuses):
+    def hook(event):
+        if event["event"] == "response" and "/metadata" not in event["url"]:
+            statuses[event["status"]] += 1
+    return Gwasapi(base_url=server.base_url, hooks=[hook])
+
+
+def new_release(server, name):
+    metadata = copy.deepcopy(server.fixtures["metadata"])
+    metadata["dbRelease"] = name
+    server.fixtures["metadata"] = metadata
+
+
+def test_unchanged_pages_are_not_downloaded_after_a_new_release(server, tmp_path):
+    statuses = Counter()
+    api = client(server, statuses)
+    with Mirror(str(tmp_path / "mirror.db")) as mirror:
+        assert mirror.sync(api, ["snps"], page_size=10)["snps"] == {"added": 50, "changed": 0, "removed": 0}
+        assert statuses == {200: 5}
+        statuses.clear()
+
+        new_release(server, "next")
+        assert mirror.sync(api, ["snps"], page_size=10)["snps"] == {"added": 0, "changed": 0, "removed": 0}
+        assert statuses == {304: 5}
+        assert mirror.count("snps") == 50
+
+
+def test_records_missing_from_a_new_release_are_removed(server, tmp_path):
+    statuses = Counter()
+    api = client(server, statuses)
+    with Mirror(str(tmp_path / "mirror.db")) as mirror:
+        mirror.sync(api, ["snps"], page_size=10)
+        statuses.clear()
+
+        server.pages = 4
+        new_release(server, "next")
+        counts = mirror.sync(api, ["snps"], page_size=10)["snps"]
+        # page metadata names the new page count, so every remaining page changed
+        assert counts == {"added": 0, "changed": 0, "removed": 10}
+        assert statuses == {200: 4}
+        assert mirror.count("snps") == 40
+        assert mirror.get("snps", "rs45") is None
+
+
+def test_interrupted_sync_resumes_from_the_next_page(server, tmp_path):
+    statuses = Counter()
+    api = client(server, statuses)
+    fetch = api.get_if_changed
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("connection lost")
+        return fetch(*args, **kwargs)
+
+    api.get_if_changed = flaky
+    with Mirror(str(tmp_path / "mirror.db")) as mirror:
+        with pytest.raises(RuntimeError):
+            mirror.sync(api, ["snps"], page_size=10)
+        assert mirror.count("snps") == 20
+        statuses.clear()
+        assert mirror.sync(api, ["snps"], page_size=10)["snps"]["added"] == 30
+        assert statuses == {200: 3}
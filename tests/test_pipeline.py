@@ -0,0 +1,43 @@
+"""
+Backpressure of biora.pipeline.JoinPipeline, with in-process fake sources.
+"""
+import time
+
+from biora.pipeline import JoinPipeline
+
+
+class FakeGwas:
+    def __init__(self, count):
+        self.count = count
+        self.read = 0
+
+    def iter_associations(self, **params):
+        for number in range(self.count):
+            self.read += 1
+            yield {"association_id": number, "pubmed_id": str(number)}
+
+
+class SlowLiterature:
+    max_workers = 2
+
+    def convert_ids(self, pmids):
+        return {pmid: "PMC" + pmid for pmid in pmids}
+
+    def get_article(self, pmcid):
+        time.sleep(0.01)
+        return {"pmcid": pmcid, "title": pmcid, "sections": []}
+
+
+def test_queue_size_bounds_associations_waiting_for_lookups():
+    gwas = FakeGwas(200)
+    pipeline = JoinPipeline(gwas, literature=SlowLiterature(), queue_size=10)
+    records = pipeline.run()
+    next(records)
+    # every association read holds a slot until its record is emitted
+    assert gwas.read <= 10 + 1
+    emitted = 1
+    for record in records:
+        emitted += 1
+        assert gwas.read - emitted <= 10 + 1
+        assert record.literature["pmcid"] == "PMC" + record.association["pubmed_id"]
+    assert emitted == 200
@@ -0,0 +1,88 @@
+"""
+Circuit breaker trials through Gwasapi and AsyncGwasapi, with injected transports.
+"""
+import asyncio
+import datetime
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from gwascat import Gwasapi
+from gwascat.resilience import CircuitBreaker, CircuitOpenError
+
+
+class Transport(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.error = requests.ConnectionError("down")
+
+    def send(self, request, **kwargs):
+        if self.error is not None:
+            raise self.error
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"dbRelease": "test"}'
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+    def close(self):
+        pass
+
+
+def open_circuit(api, breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(requests.ConnectionError):
+            api.get_metadata()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        api.get_metadata()
+    time.sleep(breaker.reset_timeout * 1.5)
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError("truncated"), KeyboardInterrupt()])
+def test_failed_trial_leaves_the_breaker_usable(error):
+    transport = Transport()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    api = Gwasapi(base_url="http://gwas.test", transport=transport, retry=None, circuit_breaker=breaker)
+    open_circuit(api, breaker)
+
+    transport.error = error
+    with pytest.raises(type(error)):
+        api.get_metadata()
+    if isinstance(error, Exception):
+        # a failed trial re-opens the circuit until the next reset timeout
+        time.sleep(breaker.reset_timeout * 1.5)
+
+    transport.error = None
+    assert api.get_metadata() == {"dbRelease": "test"}
+    assert not breaker.is_open
+
+
+def test_cancelled_async_trial_is_released():
+    httpx = pytest.importorskip("httpx")
+    from gwascat import AsyncGwasapi
+
+    async def handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"dbRelease": "test"})
+
+    async def main():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        api = AsyncGwasapi(
+            base_url="http://gwas.test", circuit_breaker=breaker, retry=None, transport=httpx.MockTransport(handler)
+        )
+        breaker.record_failure()
+        await asyncio.sleep(0.02)
+        task = asyncio.ensure_future(api.get_metadata())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the next call is let through as a new trial instead of failing fast
+        breaker.before_call()
+
+    asyncio.run(main())